@@ -7,4 +7,5 @@ __all__ = [
     "cp_sat_solver",
     "viz",
     "cli",
+    "tuning",
 ]
@@ -1,14 +1,23 @@
 import argparse
 import sys
+import time
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Callable, Dict, Optional, Sequence
 
-from .cp_sat_solver import solve_cp_sat, solve_cp_sat_reachability
+from .cp_sat_solver import load_solver_params, solve_cp_sat, solve_cp_sat_reachability, solve_portfolio
 from .image_parser import calibrate_color_stats_multi, classify_image, load_stats, map_to_string, save_stats
-from .ilp_solver import solve_ilp
+from .ilp_solver import SolverResult, solve_ilp
 from .parser import parse_map_file
+from .tuning import default_tuning_cases, params_file_text, tune_parameters
 from .viz import display_solution, save_solution_plot
 
+SOLVERS: Dict[str, Callable[..., SolverResult]] = {
+    "ilp": solve_ilp,
+    "cp-sat": solve_cp_sat,
+    "cp-sat-2": solve_cp_sat_reachability,
+    "portfolio": solve_portfolio,
+}
+
 
 def _build_solve_parser(parser: argparse.ArgumentParser) -> None:
     src_group = parser.add_mutually_exclusive_group(required=True)
@@ -26,9 +35,38 @@ def _build_solve_parser(parser: argparse.ArgumentParser) -> None:
     )
     parser.add_argument(
         "--solver",
-        choices=["ilp", "cp-sat", "cp-sat-2"],
+        choices=list(SOLVERS),
         default="cp-sat",
-        help="Solver backend and strategy to use (default: cp-sat, note: cp-sat-2 has a bug related to connectivity and is not recommended).",
+        help=(
+            "Solver backend and strategy to use (default: cp-sat; cp-sat-2 uses layered Boolean reachability with a "
+            "15 second limit; portfolio races cp-sat and cp-sat-2 in parallel and keeps the first optimal result)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of CP-SAT search workers (default: one per CPU core, at least 8; ignored by the ilp solver).",
+    )
+    parser.add_argument(
+        "--gap",
+        type=float,
+        default=None,
+        help="Stop CP-SAT once the score is within this relative gap of the best bound, e.g. 0.01 (default: solve to optimality).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print the CP-SAT search log, including which subsolvers found solutions (ignored by the ilp solver).",
+    )
+    parser.add_argument(
+        "--cp-sat-params",
+        dest="cp_sat_params",
+        default=None,
+        help=(
+            "Path to CP-SAT SatParameters in protobuf text format "
+            "(default: bundled parameter overrides, currently CP-SAT defaults)."
+        ),
     )
 
 
@@ -61,6 +99,27 @@ def _build_calibrate_parser(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def _build_tune_parser(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--maps-dir",
+        default="maps",
+        help="Directory containing the bundled map text files to tune on (default: maps).",
+    )
+    parser.add_argument(
+        "--output",
+        default="src/enclose_horse/data/cp_sat_params.txt",
+        help="Output path for the selected CP-SAT parameters (default: src/enclose_horse/data/cp_sat_params.txt).",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=60.0,
+        help="Per-solve time limit in seconds (default: 60).",
+    )
+    parser.add_argument("--repeats", type=int, default=1, help="Solves per map and candidate (default: 1).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of CP-SAT search workers.")
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     args = list(argv) if argv is not None else sys.argv[1:]
     if args[:1] == ["calibrate"]:
@@ -69,6 +128,12 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         ns = parser.parse_args(args[1:])
         ns.command = "calibrate"
         return ns
+    if args[:1] == ["tune"]:
+        parser = argparse.ArgumentParser(description="Tune CP-SAT parameters on the bundled maps.")
+        _build_tune_parser(parser)
+        ns = parser.parse_args(args[1:])
+        ns.command = "tune"
+        return ns
     if args[:1] == ["solve"]:
         parser = argparse.ArgumentParser(description="Horse enclosure ILP solver.")
         _build_solve_parser(parser)
@@ -111,10 +176,26 @@ def _run_calibrate(ns: argparse.Namespace) -> int:
     return 0
 
 
+def _run_tune(ns: argparse.Namespace) -> int:
+    cases = default_tuning_cases(ns.maps_dir)
+    if not cases:
+        raise ValueError(f"No tuning maps found in {ns.maps_dir}.")
+    results = tune_parameters(cases, time_limit=ns.time_limit, workers=ns.workers, repeats=ns.repeats)
+    for result in results:
+        print(f"{result.name:>20}: {result.total_seconds:7.2f}s ({result.solved}/{len(cases) * ns.repeats} optimal)")
+    output_path = Path(ns.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(params_file_text(results[0]))
+    print(f"Wrote CP-SAT parameters ({results[0].name}) to {output_path}")
+    return 0
+
+
 def main(args: Optional[argparse.Namespace] = None) -> int:
     ns = args or parse_args()
     if getattr(ns, "command", "solve") == "calibrate":
         return _run_calibrate(ns)
+    if getattr(ns, "command", "solve") == "tune":
+        return _run_tune(ns)
     if ns.map_path:
         map_data = parse_map_file(ns.map_path)
     else:
@@ -124,15 +205,17 @@ def main(args: Optional[argparse.Namespace] = None) -> int:
             Path(ns.write_map).write_text(map_to_string(map_data))
             print(f"Wrote parsed map to {ns.write_map}")
 
-    import time as _time
-    start_time = _time.time()
-    if ns.solver == "cp-sat":
-        result = solve_cp_sat(map_data, max_walls=ns.max_walls)
-    elif ns.solver == "cp-sat-2":
-        result = solve_cp_sat_reachability(map_data, max_walls=ns.max_walls)
-    else:
-        result = solve_ilp(map_data, max_walls=ns.max_walls)
-    end_time = _time.time()
+    params = load_solver_params(ns.cp_sat_params) if ns.cp_sat_params else None
+
+    # Worker, parameter, gap, and logging options only apply to the CP-SAT backends.
+    solver_options = (
+        {}
+        if ns.solver == "ilp"
+        else {"workers": ns.workers, "params": params, "relative_gap": ns.gap, "verbose": ns.verbose}
+    )
+    start_time = time.time()
+    result = SOLVERS[ns.solver](map_data, max_walls=ns.max_walls, **solver_options)
+    end_time = time.time()
     print(f"Solved in {end_time - start_time:.2f} seconds.")
     print(f"Status: {result.status}")
     print(f"Objective (score): {result.objective}")
@@ -1,8 +1,26 @@
-from typing import Dict, Tuple
-
+import multiprocessing
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from importlib import resources
+from pathlib import Path
+from typing import AbstractSet, Any, Callable, Dict, List, Tuple
+
+from google.protobuf import text_format
+from ortools.sat import sat_parameters_pb2
 from ortools.sat.python import cp_model
 
-from .graph import build_adjacency, candidate_tiles
+from .graph import (
+    build_adjacency,
+    candidate_tiles,
+    grid_symmetries,
+    no_wall_tiles,
+    prune_tiles,
+    tile_values,
+    undirected_edges,
+)
 from .ilp_solver import Assignment, SolverResult
 from .parser import Coord, MapData
 
@@ -18,174 +36,556 @@ def _status_string(status: int) -> str:
     return status_map.get(status, "Unknown")
 
 
-def solve_cp_sat(map_data: MapData, max_walls: int) -> SolverResult:
+# CP-SAT's portfolio (LP, no-LP, probing, LNS, ...) needs several workers to be effective;
+# even on machines with few cores, interleaving 8 diverse workers beats a single one.
+MIN_DEFAULT_WORKERS = 8
+
+
+@lru_cache(maxsize=1)
+def _load_default_params_text() -> str:
+    return resources.files("enclose_horse").joinpath("data/cp_sat_params.txt").read_text()
+
+
+def load_solver_params(path: Path | str | None = None) -> str:
+    """Read CP-SAT SatParameters overrides in protobuf text format.
+
+    Defaults to the bundled parameter overrides, which are currently CP-SAT defaults.
+    """
+    if path is None:
+        return _load_default_params_text()
+    return Path(path).read_text()
+
+
+def _configure_solver(
+    solver: cp_model.CpSolver,
+    workers: int | None,
+    params: str | None = None,
+    relative_gap: float | None = None,
+    verbose: bool = False,
+) -> None:
+    """Apply parameter overrides, then run CP-SAT's parallel portfolio on all cores unless a worker count is given.
+
+    With ``relative_gap`` the search stops once the incumbent is within that fraction of the best bound; ``verbose``
+    prints CP-SAT's search log (presolve summary, per-subsolver statistics) to stdout.
+    """
+    if params is None:
+        params = load_solver_params()
+    overrides = sat_parameters_pb2.SatParameters()
+    try:
+        text_format.Merge(params, overrides)
+    except text_format.ParseError as exc:
+        raise ValueError("Invalid CP-SAT parameters; expected SatParameters in protobuf text format.") from exc
+    # Older OR-Tools releases expose solver.parameters as the protobuf message itself; newer ones wrap it in a
+    # C++-backed class that text_format cannot write into but that merges text format directly.
+    if isinstance(solver.parameters, sat_parameters_pb2.SatParameters):
+        solver.parameters.MergeFrom(overrides)
+    else:
+        solver.parameters.merge_text_format(text_format.MessageToString(overrides))
+    if workers is None:
+        workers = max(os.cpu_count() or 1, MIN_DEFAULT_WORKERS)
+    solver.parameters.num_workers = workers
+    solver.parameters.log_search_progress = verbose
+    if verbose:
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = print
+    if relative_gap is not None:
+        if relative_gap < 0:
+            raise ValueError("relative_gap must be non-negative.")
+        solver.parameters.relative_gap_limit = relative_gap
+
+
+def _extract_result(
+    solver: cp_model.CpSolver,
+    status: int,
+    candidates: AbstractSet[Coord],
+    wall_vars: Dict[Coord, cp_model.IntVar],
+    inside_vars: Dict[Coord, cp_model.IntVar],
+    proves_optimality: bool = True,
+) -> SolverResult:
+    """Read the solution; ``proves_optimality=False`` marks a restricted model whose optimum is only feasible."""
+    assignments: Dict[Coord, Assignment] = {}
+    for coord in candidates:
+        if solver.value(wall_vars[coord]) >= 1:
+            assignments[coord] = "wall"
+        elif solver.value(inside_vars[coord]) >= 1:
+            assignments[coord] = "pasture"
+        else:
+            assignments[coord] = "grass"
+
+    objective_value = solver.objective_value if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+    # CP-SAT reports OPTIMAL when a gap limit stops the search; only a closed gap is a proof.
+    if status == cp_model.OPTIMAL and solver.best_objective_bound > solver.objective_value + 1e-6:
+        status = cp_model.FEASIBLE
+    if status == cp_model.OPTIMAL and not proves_optimality:
+        status = cp_model.FEASIBLE
+    return SolverResult(status=_status_string(status), objective=objective_value, assignments=assignments)
+
+
+def _solve(solver: cp_model.CpSolver, model: cp_model.CpModel, stop_event: Any | None = None) -> int:
+    """Solve the model; if ``stop_event`` (a threading/multiprocessing Event) is set, interrupt the search early."""
+    if stop_event is None:
+        return solver.solve(model)
+    finished = threading.Event()
+
+    def watch() -> None:
+        while not finished.is_set():
+            if stop_event.wait(0.05):
+                solver.stop_search()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        return solver.solve(model)
+    finally:
+        finished.set()
+        watcher.join()
+
+
+def _tile_vars(
+    model: cp_model.CpModel,
+    coord: Coord,
+    root: Coord,
+    wallable: AbstractSet[Coord],
+    enclosable: AbstractSet[Coord],
+) -> Tuple[cp_model.IntVar, cp_model.IntVar]:
+    """Wall and inside literals for a tile, as constants where the rules already decide them.
+
+    Tiles outside ``wallable`` get a constant 0 wall, the root is fixed inside, and tiles outside ``enclosable`` are
+    fixed outside. Fixing the domain up front keeps these out of the constraint list entirely.
+    """
+    r, c = coord
+    wall = model.new_bool_var(f"wall_{r}_{c}") if coord in wallable else model.new_constant(0)
+    if coord == root:
+        inside = model.new_constant(1)
+    elif coord in enclosable:
+        inside = model.new_bool_var(f"inside_{r}_{c}")
+    else:
+        inside = model.new_constant(0)
+    return wall, inside
+
+
+def _add_separation(
+    model: cp_model.CpModel,
+    inside_vars: Dict[Coord, cp_model.IntVar],
+    wall_vars: Dict[Coord, cp_model.IntVar],
+    u: Coord,
+    v: Coord,
+) -> None:
+    """Differing inside status across an edge requires a wall on one of its endpoints."""
+    terms = [inside_vars[u], inside_vars[v], wall_vars[u], wall_vars[v]]
+    model.add(cp_model.LinearExpr.weighted_sum(terms, [1, -1, -1, -1]) <= 0)
+    model.add(cp_model.LinearExpr.weighted_sum(terms, [-1, 1, -1, -1]) <= 0)
+
+
+def _greedy_enclosure(
+    map_data: MapData,
+    max_walls: int,
+    adjacency: Dict[Coord, List[Coord]],
+    no_wall_coords: AbstractSet[Coord],
+) -> Dict[Coord, Assignment] | None:
+    """Grow a pasture from the horse, walling its frontier, and keep the best feasible snapshot.
+
+    Each step absorbs the frontier tile that grows the frontier least (unwallable tiles first, since
+    they can never be fenced off). Returns None when no snapshot fits within ``max_walls``.
+    """
+    root = map_data.horse
+    last_row, last_col = map_data.height - 1, map_data.width - 1
+    interior = {(r, c) for r, c in adjacency if 0 < r < last_row and 0 < c < last_col}
+
+    # The region only grows, so a snapshot is just a prefix length of the absorption order plus the frontier.
+    order: List[Coord] = [root]
+    frontier: set[Coord] = set(adjacency[root])
+    seen: set[Coord] = {root} | frontier
+    values = tile_values(map_data)
+    score = values[root]
+    best: Tuple[int, int, frozenset[Coord]] | None = None
+
+    while True:
+        if len(frontier) <= max_walls and frontier.isdisjoint(no_wall_coords):
+            if best is None or score > best[0]:
+                best = (score, len(order), frozenset(frontier))
+
+        chosen: Coord | None = None
+        chosen_key: Tuple[int, int] | None = None
+        for coord in frontier:
+            if coord not in interior:
+                continue
+            key = (coord not in no_wall_coords, sum(1 for n in adjacency[coord] if n not in seen))
+            if chosen_key is None or key < chosen_key:
+                chosen, chosen_key = coord, key
+        if chosen is None:
+            break
+        frontier.discard(chosen)
+        order.append(chosen)
+        score += values[chosen]
+        for n in adjacency[chosen]:
+            if n not in seen:
+                seen.add(n)
+                frontier.add(n)
+
+    if best is None:
+        return None
+    _, size, walls = best
+    assignments: Dict[Coord, Assignment] = {coord: "grass" for coord in adjacency}
+    assignments.update({coord: "pasture" for coord in order[:size]})
+    assignments.update({coord: "wall" for coord in walls})
+    return assignments
+
+
+def _add_hints(
+    model: cp_model.CpModel,
+    hint: Dict[Coord, Assignment] | None,
+    wall_vars: Dict[Coord, cp_model.IntVar],
+    inside_vars: Dict[Coord, cp_model.IntVar],
+) -> None:
+    if hint is None:
+        return
+    # Fixed tiles share new_constant's cached variables, which must not be hinted twice.
+    hinted: set[int] = set()
+    for coord, state in hint.items():
+        for var, value in ((wall_vars[coord], state == "wall"), (inside_vars[coord], state == "pasture")):
+            if var.index not in hinted:
+                hinted.add(var.index)
+                model.add_hint(var, int(value))
+
+
+def _add_symmetry_breaking(
+    model: cp_model.CpModel,
+    wall_vars: Dict[Coord, cp_model.IntVar],
+    symmetries: List[Dict[Coord, Coord]],
+) -> None:
+    """Lex-leader constraints: the row-major wall vector must be <= its image under every map symmetry.
+
+    ``equal`` tracks whether the prefix so far matches its image; while it does, the next wall may only be placed if
+    its image also holds one. Positions whose literal maps onto itself (fixed points, forced-zero walls) are skipped.
+    """
+    order = sorted(wall_vars)
+    for symmetry in symmetries:
+        equal = model.new_constant(1)
+        for coord in order:
+            x, y = wall_vars[coord], wall_vars[symmetry[coord]]
+            if x.index == y.index:
+                continue
+            model.add_bool_or([equal.negated(), x.negated(), y])
+            following = model.new_bool_var("")
+            model.add_bool_or([equal.negated(), y, following])
+            model.add_bool_or([equal.negated(), x.negated(), following])
+            equal = following
+
+
+def _canonical_hint(
+    hint: Dict[Coord, Assignment] | None, symmetries: List[Dict[Coord, Coord]]
+) -> Dict[Coord, Assignment] | None:
+    """Map the hint to the symmetric image that satisfies the lex-leader constraints (the lex-smallest wall vector)."""
+    if hint is None or not symmetries:
+        return hint
+    order = sorted(hint)
+    images = [hint] + [{symmetry[coord]: state for coord, state in hint.items()} for symmetry in symmetries]
+    return min(images, key=lambda image: [image[coord] == "wall" for coord in order])
+
+
+def _tree_flows(
+    root: Coord, hint: Dict[Coord, Assignment], adjacency: Dict[Coord, List[Coord]]
+) -> Dict[Tuple[Coord, Coord], int]:
+    """Flow values for a hinted pasture: each BFS-tree arc carries the size of the subtree below it."""
+    parent: Dict[Coord, Coord] = {}
+    order = [root]
+    for node in order:
+        for neighbor in adjacency[node]:
+            if neighbor != root and neighbor not in parent and hint[neighbor] == "pasture":
+                parent[neighbor] = node
+                order.append(neighbor)
+    subtree = {node: 1 for node in order}
+    flows: Dict[Tuple[Coord, Coord], int] = {}
+    for node in reversed(order[1:]):
+        flows[(parent[node], node)] = subtree[node]
+        subtree[parent[node]] += subtree[node]
+    return flows
+
+
+def _add_separation_clauses(
+    model: cp_model.CpModel,
+    not_inside: Dict[Coord, cp_model.IntVar],
+    inside_vars: Dict[Coord, cp_model.IntVar],
+    wall_vars: Dict[Coord, cp_model.IntVar],
+    u: Coord,
+    v: Coord,
+) -> None:
+    """Clause form of _add_separation: inside on one side and outside on the other needs a wall."""
+    model.add_bool_or([not_inside[u], inside_vars[v], wall_vars[u], wall_vars[v]])
+    model.add_bool_or([not_inside[v], inside_vars[u], wall_vars[u], wall_vars[v]])
+
+
+def solve_cp_sat(
+    map_data: MapData,
+    max_walls: int,
+    workers: int | None = None,
+    params: str | None = None,
+    stop_event: Any | None = None,
+    relative_gap: float | None = None,
+    verbose: bool = False,
+) -> SolverResult:
     """Original CP-SAT formulation (flow-based)."""
     candidates = candidate_tiles(map_data)
     adjacency = build_adjacency(map_data)
     root = map_data.horse
-    no_wall_coords = (
-        set(map_data.portal_ids)
-        | set(map_data.cherries)
-        | set(map_data.golden_apples)
-        | set(map_data.bees)
-        | {root}
-    )
+    no_wall_coords = no_wall_tiles(map_data)
+    enclosable, wallable = prune_tiles(map_data)
+    values = tile_values(map_data)
 
     model = cp_model.CpModel()
     wall_vars: Dict[Coord, cp_model.IntVar] = {}
     inside_vars: Dict[Coord, cp_model.IntVar] = {}
 
-    for coord in candidates:
-        wall_vars[coord] = model.NewBoolVar(f"wall_{coord[0]}_{coord[1]}")
-        inside_vars[coord] = model.NewBoolVar(f"inside_{coord[0]}_{coord[1]}")
-        model.Add(wall_vars[coord] + inside_vars[coord] <= 1)
-
-        if coord in no_wall_coords:
-            model.Add(wall_vars[coord] == 0)
-
-        r, c = coord
-        if coord != root and (r in (0, map_data.height - 1) or c in (0, map_data.width - 1)):
-            model.Add(inside_vars[coord] == 0)
-
-    model.Add(inside_vars[root] == 1)
-
-    model.Add(sum(wall_vars.values()) <= max_walls)
+    wall_list: List[cp_model.IntVar] = []
+    inside_list: List[cp_model.IntVar] = []
+    objective_weights: List[int] = []
 
-    handled_edges: set[Tuple[Coord, Coord]] = set()
-    for u in adjacency:
-        for v in adjacency[u]:
-            edge = tuple(sorted((u, v)))
-            if edge in handled_edges:
-                continue
-            handled_edges.add(edge)
-            model.Add(inside_vars[u] - inside_vars[v] <= wall_vars[u] + wall_vars[v])
-            model.Add(inside_vars[v] - inside_vars[u] <= wall_vars[u] + wall_vars[v])
-
-    big_m = len(candidates) + 1
+    for coord in candidates:
+        wall, inside = _tile_vars(model, coord, root, wallable, enclosable)
+        wall_vars[coord] = wall
+        inside_vars[coord] = inside
+        wall_list.append(wall)
+        inside_list.append(inside)
+        objective_weights.append(values[coord])
+        if coord in wallable and coord in enclosable:
+            model.add(wall + inside <= 1)
+
+    model.add(cp_model.LinearExpr.sum(wall_list) <= max_walls)
+
+    for u, v in undirected_edges(map_data):
+        if u in enclosable or v in enclosable:
+            _add_separation(model, inside_vars, wall_vars, u, v)
+
+    # Flow may only leave inside tiles. Walls are never inside, so a single enforcement literal
+    # replaces both big-M capacity rows (which gave CP-SAT a weak linear relaxation). Tiles that can
+    # never be inside carry no flow, so arcs are only created between enclosable tiles.
+    max_flow = len(enclosable)
     flow_vars: Dict[Tuple[Coord, Coord], cp_model.IntVar] = {}
-    for u in adjacency:
+    in_flows: Dict[Coord, List[cp_model.IntVar]] = defaultdict(list)
+    out_flows: Dict[Coord, List[cp_model.IntVar]] = defaultdict(list)
+    for u in enclosable:
         for v in adjacency[u]:
-            flow_vars[(u, v)] = model.NewIntVar(0, big_m, f"f_{u}_{v}")
-            model.Add(flow_vars[(u, v)] <= big_m * inside_vars[u])
-            model.Add(flow_vars[(u, v)] <= big_m * (1 - wall_vars[u]))
-
-    total_inside = sum(inside_vars[c] for c in candidates if c != root)
-    for node in candidates:
-        incoming = sum(flow_vars[(u, v)] for (u, v) in flow_vars if v == node)
-        outgoing = sum(flow_vars[(u, v)] for (u, v) in flow_vars if u == node)
+            if v not in enclosable:
+                continue
+            flow = model.new_int_var(0, max_flow, f"f_{u}_{v}")
+            model.add(flow == 0).only_enforce_if(inside_vars[u].negated())
+            flow_vars[(u, v)] = flow
+            out_flows[u].append(flow)
+            in_flows[v].append(flow)
+
+    # The root is fixed inside, so it supplies one unit of flow to every other inside tile.
+    total_inside = cp_model.LinearExpr.sum(inside_list) - 1
+    for node in enclosable:
+        incoming = cp_model.LinearExpr.sum(in_flows[node])
+        outgoing = cp_model.LinearExpr.sum(out_flows[node])
         if node == root:
-            model.Add(outgoing - incoming == total_inside)
+            model.add(outgoing - incoming == total_inside)
         else:
-            model.Add(incoming - outgoing == inside_vars[node])
+            model.add(incoming - outgoing == inside_vars[node])
 
-    cherry_bonus = sum(3 * inside_vars[c] for c in map_data.cherries)
-    golden_bonus = sum(10 * inside_vars[c] for c in map_data.golden_apples)
-    bee_penalty = sum(5 * inside_vars[c] for c in map_data.bees)
-    model.Maximize(sum(inside_vars.values()) + cherry_bonus + golden_bonus - bee_penalty)
+    # Score: 1 per pasture tile, +3 cherry, +10 golden apple, -5 bee.
+    model.maximize(cp_model.LinearExpr.weighted_sum(inside_list, objective_weights))
 
     solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-
-    assignments: Dict[Coord, Assignment] = {}
-    for coord in candidates:
-        if solver.Value(wall_vars[coord]) >= 1:
-            assignments[coord] = "wall"
-        elif solver.Value(inside_vars[coord]) >= 1:
-            assignments[coord] = "pasture"
+    _configure_solver(solver, workers, params, relative_gap, verbose)
+    symmetries = grid_symmetries(map_data)
+    _add_symmetry_breaking(model, wall_vars, symmetries)
+    hint = _canonical_hint(_greedy_enclosure(map_data, max_walls, adjacency, no_wall_coords), symmetries)
+    _add_hints(model, hint, wall_vars, inside_vars)
+    if hint is not None:
+        tree_flows = _tree_flows(root, hint, adjacency)
+        for arc, flow_var in flow_vars.items():
+            model.add_hint(flow_var, tree_flows.get(arc, 0))
+    status = _solve(solver, model, stop_event)
+
+    return _extract_result(solver, status, candidates, wall_vars, inside_vars)
+
+
+def _bfs_distances(root: Coord, adjacency: Dict[Coord, List[Coord]], allowed: AbstractSet[Coord]) -> Dict[Coord, int]:
+    distances = {root: 0}
+    order = [root]
+    for node in order:
+        for neighbor in adjacency[node]:
+            if neighbor in allowed and neighbor not in distances:
+                distances[neighbor] = distances[node] + 1
+                order.append(neighbor)
+    return distances
+
+
+def _add_layered_reachability(
+    model: cp_model.CpModel,
+    root: Coord,
+    adjacency: Dict[Coord, List[Coord]],
+    inside_vars: Dict[Coord, cp_model.IntVar],
+    enclosable: AbstractSet[Coord],
+    max_depth: int,
+) -> bool:
+    """Every inside tile must be reached from the root within ``max_depth`` steps through inside tiles.
+
+    ``reach[k][v]`` means v is reachable in at most k steps; it needs v or a neighbour reached at k - 1, and only
+    inside tiles may be reached (walls are never inside, so no extra wall literals are needed). Tiles farther than k
+    grid steps from the root get no layer-k literal at all. A simple path through the n enclosable tiles connected to
+    the root has at most n - 1 steps, so that is the exact depth and deeper layers are never built; a smaller
+    ``max_depth`` is a heuristic that may cut off feasible pastures. Returns whether ``max_depth`` is that tight.
+    """
+    distances = _bfs_distances(root, adjacency, enclosable)
+    capped = max_depth < len(distances) - 1
+    max_depth = min(max_depth, len(distances) - 1)
+    # Tiles in BFS order with their reachable neighbourhoods, so each layer is a straight scan.
+    neighbourhoods = [
+        (coord, dist, inside_vars[coord], [n for n in (coord, *adjacency[coord]) if n in distances])
+        for coord, dist in distances.items()
+        if coord != root
+    ]
+    previous: Dict[Coord, cp_model.IntVar] = {root: model.new_constant(1)}
+    for depth in range(1, max_depth + 1):
+        layer: Dict[Coord, cp_model.IntVar] = {root: previous[root]}
+        for coord, dist, inside, neighbourhood in neighbourhoods:
+            if dist > depth:
+                break
+            reach = model.new_bool_var(f"reach_{depth}_{coord[0]}_{coord[1]}")
+            # reach => OR(supports), written as a single clause rather than an enforced one.
+            model.add_bool_or([reach.negated(), *(previous[n] for n in neighbourhood if n in previous)])
+            model.add_implication(reach, inside)
+            layer[coord] = reach
+        previous = layer
+
+    for coord in enclosable:
+        if coord == root:
+            continue
+        inside = inside_vars[coord]
+        if coord in previous:
+            model.add_implication(inside, previous[coord])
         else:
-            assignments[coord] = "grass"
-
-    objective_value = solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
-    return SolverResult(status=_status_string(status), objective=objective_value, assignments=assignments)
-
-
-def solve_cp_sat_reachability(map_data: MapData, max_walls: int) -> SolverResult:
-    """Boolean reachability propagation without big-M flow. Just optimize for reachable tiles, then perform a BFS to confirm connectivity."""
+            model.add(inside == 0)
+    return capped
+
+
+def solve_cp_sat_reachability(
+    map_data: MapData,
+    max_walls: int,
+    workers: int | None = None,
+    params: str | None = None,
+    stop_event: Any | None = None,
+    relative_gap: float | None = None,
+    verbose: bool = False,
+) -> SolverResult:
+    """Layered Boolean reachability: no flow or order integers, connectivity is carried by SAT propagation.
+
+    Reachability depth is capped at ``2 * max(width, height)`` steps, so pathological spiral pastures whose in-pasture
+    path length exceeds that are not found. The exact cap (one less than the number of enclosable tiles connected to
+    the horse) makes the model too large to solve the bundled maps within the time limit, so whenever the cap is
+    tighter than that the result is reported as Feasible, never Optimal.
+    """
     candidates = candidate_tiles(map_data)
     adjacency = build_adjacency(map_data)
     root = map_data.horse
-    no_wall_coords = (
-        set(map_data.portal_ids)
-        | set(map_data.cherries)
-        | set(map_data.golden_apples)
-        | set(map_data.bees)
-        | {root}
-    )
+    no_wall_coords = no_wall_tiles(map_data)
+    enclosable, wallable = prune_tiles(map_data)
+    values = tile_values(map_data)
 
     model = cp_model.CpModel()
     wall_vars: Dict[Coord, cp_model.IntVar] = {}
     inside_vars: Dict[Coord, cp_model.IntVar] = {}
 
-    for coord in candidates:
-        wall_vars[coord] = model.NewBoolVar(f"wall_{coord[0]}_{coord[1]}")
-        inside_vars[coord] = model.NewBoolVar(f"inside_{coord[0]}_{coord[1]}")
-
-        # A tile cannot be both a wall and reachable.
-        model.Add(wall_vars[coord] + inside_vars[coord] <= 1)
-
-        # Certain tiles cannot be walls.
-        if coord in no_wall_coords:
-            model.Add(wall_vars[coord] == 0)
-
-        # Boundary tiles (except root) cannot be reachable, else the horse escapes!
-        r, c = coord
-        if coord != root and (r in (0, map_data.height - 1) or c in (0, map_data.width - 1)):
-            model.Add(inside_vars[coord] == 0)
+    not_inside: Dict[Coord, cp_model.IntVar] = {}
+    wall_list: List[cp_model.IntVar] = []
+    inside_list: List[cp_model.IntVar] = []
+    objective_weights: List[int] = []
 
-    # Root is always reachable.
-    model.Add(inside_vars[root] == 1)
+    for coord in candidates:
+        wall, inside = _tile_vars(model, coord, root, wallable, enclosable)
+        wall_vars[coord] = wall
+        inside_vars[coord] = inside
+        wall_list.append(wall)
+        inside_list.append(inside)
+        objective_weights.append(values[coord])
+        not_inside[coord] = inside.negated()
+
+        # A tile cannot be both a wall and reachable (already implied when either is fixed).
+        if coord in wallable and coord in enclosable:
+            model.add_implication(wall, not_inside[coord])
 
     # Limit on walls used.
-    model.Add(sum(wall_vars.values()) <= max_walls)
+    model.add(cp_model.LinearExpr.sum(wall_list) <= max_walls)
 
     # Separation: differing reach across an edge implies a wall on that edge.
-    handled_edges: set[Tuple[Coord, Coord]] = set()
-    for u in adjacency:
-        for v in adjacency[u]:
-            edge = tuple(sorted((u, v)))
-            if edge in handled_edges:
-                continue
-            handled_edges.add(edge)
-            model.Add(inside_vars[u] - inside_vars[v] <= wall_vars[u] + wall_vars[v])
-            model.Add(inside_vars[v] - inside_vars[u] <= wall_vars[u] + wall_vars[v])
+    for u, v in undirected_edges(map_data):
+        if u in enclosable or v in enclosable:
+            _add_separation_clauses(model, not_inside, inside_vars, wall_vars, u, v)
 
-            
-    #sorting for optimization 
-    cherry_bonus = sum(3 * inside_vars[c] for c in map_data.cherries)
-    golden_bonus = sum(10 * inside_vars[c] for c in map_data.golden_apples)
-    bee_penalty = sum(5 * inside_vars[c] for c in map_data.bees)
-    model.Maximize(sum(inside_vars.values()) + cherry_bonus + golden_bonus - bee_penalty)
+    max_depth = 2 * max(map_data.width, map_data.height)
+    capped = _add_layered_reachability(model, root, adjacency, inside_vars, enclosable, max_depth)
+
+    # Score: 1 per pasture tile, +3 cherry, +10 golden apple, -5 bee.
+    model.maximize(cp_model.LinearExpr.weighted_sum(inside_list, objective_weights))
 
     solver = cp_model.CpSolver()
+    # Defaults for this formulation; parameter overrides (bundled or --cp-sat-params) may replace them.
     solver.parameters.max_time_in_seconds = 15.0  # 15 second time limit
     solver.parameters.random_seed = 42
-    status = solver.Solve(model)
-    assignments: Dict[Coord, Assignment] = {}
-        
-    #breadth-first search from root to count reachable 'inside' tiles
-    visited: set[Coord] = set()
-    queue = [root]
-    visited.add(root)
-    while queue:
-        current = queue.pop(0)
-        for neighbor in adjacency.get(current, []):
-            if neighbor not in visited and solver.Value(inside_vars[neighbor]) >= 1:
-                visited.add(neighbor)
-                queue.append(neighbor)
-    
-    # Now, update assignments based on reachability
-    for coord in candidates:
-        if solver.Value(wall_vars[coord]) >= 1:
-            assignments[coord] = "wall"
-        elif solver.Value(inside_vars[coord]) >= 1 and coord in visited:
-            assignments[coord] = "pasture"
-        else:
-            assignments[coord] = "grass"
-
-    objective_value = (
-        len(visited)
-        + 3 * sum(1 for c in map_data.cherries if c in visited)
-        + 10 * sum(1 for c in map_data.golden_apples if c in visited)
-        - 5 * sum(1 for c in map_data.bees if c in visited)
-    )
-    return SolverResult(status=_status_string(status), objective=objective_value, assignments=assignments)
+    _configure_solver(solver, workers, params, relative_gap, verbose)
+    symmetries = grid_symmetries(map_data)
+    _add_symmetry_breaking(model, wall_vars, symmetries)
+    hint = _canonical_hint(_greedy_enclosure(map_data, max_walls, adjacency, no_wall_coords), symmetries)
+    _add_hints(model, hint, wall_vars, inside_vars)
+    status = _solve(solver, model, stop_event)
+
+    return _extract_result(solver, status, candidates, wall_vars, inside_vars, proves_optimality=not capped)
+
+
+# OR-Tools starts native threads on import, which do not survive fork().
+_SPAWN = multiprocessing.get_context("spawn")
+PORTFOLIO_SOLVERS: Tuple[Callable[..., SolverResult], ...] = (solve_cp_sat, solve_cp_sat_reachability)
+
+
+def solve_portfolio(
+    map_data: MapData,
+    max_walls: int,
+    workers: int | None = None,
+    params: str | None = None,
+    relative_gap: float | None = None,
+    verbose: bool = False,
+) -> SolverResult:
+    """Race the flow and reachability formulations in separate processes and keep the first optimal answer.
+
+    An explicit ``workers`` budget is split evenly between the formulations; by default each gets half the cores but
+    never fewer than ``MIN_DEFAULT_WORKERS``, since a thin CP-SAT portfolio is far slower than an oversubscribed one.
+    Once one formulation proves optimality the other is told to stop; if neither does (e.g. the reachability time
+    limit hits), the best feasible solution is returned. The reachability model reports Feasible whenever its depth
+    cap may have cut off pastures, so its capped optimum never ends the race.
+    """
+    if workers is None:
+        share = max((os.cpu_count() or 1) // len(PORTFOLIO_SOLVERS), MIN_DEFAULT_WORKERS)
+    else:
+        share = max(1, workers // len(PORTFOLIO_SOLVERS))
+
+    with _SPAWN.Manager() as manager, ProcessPoolExecutor(max_workers=len(PORTFOLIO_SOLVERS), mp_context=_SPAWN) as pool:
+        stop_event = manager.Event()
+        pending = {
+            pool.submit(
+                solver_fn,
+                map_data,
+                max_walls,
+                workers=share,
+                params=params,
+                stop_event=stop_event,
+                relative_gap=relative_gap,
+                verbose=verbose,
+            )
+            for solver_fn in PORTFOLIO_SOLVERS
+        }
+        results: List[SolverResult] = []
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result.status == "Optimal":
+                        return result
+                    results.append(result)
+        finally:
+            stop_event.set()
+    return max(results, key=lambda r: float("-inf") if r.objective is None else r.objective)
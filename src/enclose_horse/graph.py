@@ -1,36 +1,200 @@
-from typing import Dict, Iterable, List, Set, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
 
-from .parser import Coord, MapData, Tile
+import numpy as np
 
+from .parser import NEIGHBOR_DELTAS, TILE_CODES, Coord, MapData, Tile
 
-def candidate_tiles(map_data: MapData) -> Set[Coord]:
-    """Return coordinates that can be decided by the solver (non-water)."""
-    coords: Set[Coord] = set()
-    for r, c, tile in map_data.tiles():
-        if tile not in {Tile.WATER}:
-            coords.add((r, c))
-    return coords
 
+@lru_cache(maxsize=8)
+def candidate_tiles(map_data: MapData) -> FrozenSet[Coord]:
+    """Return coordinates that can be decided by the solver (non-water). Cached per MapData instance.
 
+    The tiles are the nodes of ``grid_graph``, so the map is scanned once however many structures a solver builds.
+    """
+    return frozenset(grid_graph(map_data).coords)
+
+
+@dataclass(frozen=True, eq=False)
+class GridGraph:
+    """Candidate tiles as integer ids in row-major order, with CSR adjacency (``indptr``/``indices``, int32).
+
+    ``edges`` lists each undirected edge once as sorted ``u < v`` id pairs, shape ``(E, 2)``.
+    """
+
+    coords: List[Coord]
+    ids: Dict[Coord, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    edges: np.ndarray
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.coords)
+
+    def neighbors(self, u: int) -> np.ndarray:
+        return self.indices[self.indptr[u] : self.indptr[u + 1]]
+
+
+@lru_cache(maxsize=8)
+def grid_graph(map_data: MapData) -> GridGraph:
+    """Edge-neighboring candidate tiles plus portal links, packed as CSR. Cached per MapData instance.
+
+    Grid neighbours are found with array lookups into a padded id grid rather than per-tile neighbour loops; each
+    tile lists them in ``MapData.neighbors`` order, followed by its portal links.
+    """
+    mask = map_data.tile_array() != TILE_CODES[Tile.WATER]
+    rows, cols = np.nonzero(mask)  # row-major, so ids follow sorted coordinates
+    coords: List[Coord] = list(zip(rows.tolist(), cols.tolist()))
+    ids = {coord: i for i, coord in enumerate(coords)}
+    n = len(coords)
+
+    # Water and the padding ring hold -1, so off-grid and water neighbours drop out with one comparison.
+    id_grid = np.full((map_data.height + 2, map_data.width + 2), -1, dtype=np.int64)
+    id_grid[1:-1, 1:-1][mask] = np.arange(n)
+    node_ids = np.arange(n, dtype=np.int64)
+    sources: List[np.ndarray] = []
+    targets: List[np.ndarray] = []
+    for dr, dc in NEIGHBOR_DELTAS:
+        found = id_grid[rows + 1 + dr, cols + 1 + dc]
+        keep = found >= 0
+        sources.append(node_ids[keep])
+        targets.append(found[keep])
+
+    # Portal links: connect all tiles sharing the same portal id, both directions of every pair in one array per group.
+    for portal_coords in map_data.portals.values():
+        linked = np.array([ids[coord] for coord in portal_coords if coord in ids], dtype=np.int64)
+        first, second = np.triu_indices(len(linked), 1)
+        pairs = np.stack((linked[first], linked[second]), axis=1)
+        sources.append(pairs.ravel())
+        targets.append(pairs[:, ::-1].ravel())
+
+    # A stable sort by source keeps each tile's neighbours in the order they were generated above.
+    all_sources = np.concatenate(sources)
+    order = np.argsort(all_sources, kind="stable")
+    indices = np.concatenate(targets)[order].astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(all_sources, minlength=n), out=indptr[1:])
+
+    # Keep one u < v half-edge per pair; np.unique on packed keys drops parallel grid/portal links.
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    targets = indices.astype(np.int64)
+    forward = sources < targets
+    keys = np.unique(sources[forward] * n + targets[forward])
+    edges = np.stack(np.divmod(keys, n), axis=1).astype(np.int32)
+    return GridGraph(coords=coords, ids=ids, indptr=indptr, indices=indices, edges=edges)
+
+
+@lru_cache(maxsize=8)
 def build_adjacency(map_data: MapData) -> Dict[Coord, List[Coord]]:
-    """Adjacency for edge-neighboring candidate tiles, plus portals linking identical IDs."""
-    candidates = candidate_tiles(map_data)
-    adjacency: Dict[Coord, List[Coord]] = {coord: [] for coord in candidates}
-
-    for r, c in candidates:
-        for nr, nc in map_data.neighbors(r, c):
-            if (nr, nc) in candidates:
-                adjacency[(r, c)].append((nr, nc))
-
-    # Portal links: connect all tiles sharing the same portal id.
-    for coords in map_data.portals.values():
-        for i, src in enumerate(coords):
-            if src not in candidates:
-                continue
-            for dst in coords[i + 1 :]:
-                if dst not in candidates:
-                    continue
-                adjacency[src].append(dst)
-                adjacency[dst].append(src)
-
-    return adjacency
+    """Adjacency for edge-neighboring candidate tiles, plus portals linking identical IDs.
+
+    A coordinate-keyed view of ``grid_graph``. Cached per MapData instance and shared between solvers, so callers must
+    not mutate the result.
+    """
+    graph = grid_graph(map_data)
+    coords = graph.coords
+    return {coords[u]: [coords[v] for v in graph.neighbors(u).tolist()] for u in range(graph.num_nodes)}
+
+
+@lru_cache(maxsize=8)
+def undirected_edges(map_data: MapData) -> List[Tuple[Coord, Coord]]:
+    """Each adjacency edge once, as coordinate pairs in ``grid_graph`` edge order. Cached per MapData instance."""
+    graph = grid_graph(map_data)
+    coords = graph.coords
+    return [(coords[u], coords[v]) for u, v in graph.edges.tolist()]
+
+
+@lru_cache(maxsize=8)
+def tile_values(map_data: MapData) -> Dict[Coord, int]:
+    """Score of each candidate tile when enclosed: 1 per pasture tile, +3 cherry, +10 golden apple, -5 bee.
+
+    Shared by every solver's objective. Cached per MapData instance, so callers must not mutate the result.
+    """
+    values = dict.fromkeys(grid_graph(map_data).coords, 1)
+    for coords, bonus in ((map_data.cherries, 3), (map_data.golden_apples, 10), (map_data.bees, -5)):
+        for coord in coords:
+            values[coord] += bonus
+    return values
+
+
+@lru_cache(maxsize=8)
+def no_wall_tiles(map_data: MapData) -> FrozenSet[Coord]:
+    """Portals, cherries, golden apples, bees, and the horse cannot hold walls."""
+    return frozenset(
+        [*map_data.portal_ids, *map_data.cherries, *map_data.golden_apples, *map_data.bees, map_data.horse]
+    )
+
+
+@lru_cache(maxsize=8)
+def prune_tiles(map_data: MapData) -> Tuple[FrozenSet[Coord], FrozenSet[Coord]]:
+    """Tiles that can be inside, and tiles where a wall can matter. Cached per MapData instance.
+
+    The pasture is connected to the horse and never touches the border, so only interior tiles reachable from the horse
+    through interior tiles can be inside. A wall only separates edges with an inside endpoint, so walls away from those
+    tiles never help; dropping them keeps every optimum. No distance cap is derived from the wall budget: water fences
+    for free, so a cheap enclosure can reach arbitrarily far from the horse.
+    """
+    graph = grid_graph(map_data)
+    rows, cols = np.asarray(graph.coords, dtype=np.int64).reshape(-1, 2).T
+    # open_[v] is True while v is an interior tile not yet visited, so one list load replaces the set and bounds tests.
+    open_ = ((rows > 0) & (rows < map_data.height - 1) & (cols > 0) & (cols < map_data.width - 1)).tolist()
+    root = graph.ids[map_data.horse]
+    open_[root] = False
+    order = [root]
+    for u in order:
+        for v in graph.neighbors(u).tolist():
+            if open_[v]:
+                open_[v] = False
+                order.append(v)
+    enclosable = frozenset(graph.coords[u] for u in order)
+
+    # Wallable: enclosable tiles plus the targets of every CSR entry leaving one, minus tiles that cannot hold walls.
+    reached = np.zeros(graph.num_nodes, dtype=np.bool_)
+    reached[order] = True
+    sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+    near = reached.copy()
+    near[graph.indices[reached[sources]]] = True
+    near[[graph.ids[coord] for coord in no_wall_tiles(map_data) if coord in graph.ids]] = False
+    wallable = frozenset(graph.coords[v] for v in np.flatnonzero(near).tolist())
+    return enclosable, wallable
+
+
+@lru_cache(maxsize=8)
+def grid_symmetries(map_data: MapData) -> List[Dict[Coord, Coord]]:
+    """Mirrors and rotations of the grid that leave every tile, portal id, and the horse in place.
+
+    Each symmetry is returned as a mapping over candidate tiles; the identity is not included. Cached per MapData
+    instance and shared between solvers, so callers must not mutate the result.
+    """
+    h, w = map_data.height, map_data.width
+    transforms = [
+        lambda r, c: (h - 1 - r, c),
+        lambda r, c: (r, w - 1 - c),
+        lambda r, c: (h - 1 - r, w - 1 - c),
+    ]
+    if h == w:
+        transforms += [
+            lambda r, c: (c, r),
+            lambda r, c: (w - 1 - c, h - 1 - r),
+            lambda r, c: (c, w - 1 - r),
+            lambda r, c: (h - 1 - c, r),
+        ]
+
+    symmetries: List[Dict[Coord, Coord]] = []
+    for transform in transforms:
+        if transform(*map_data.horse) != map_data.horse:
+            continue
+        mapping: Dict[Coord, Coord] = {}
+        for r, c, tile in map_data.tiles():
+            image = transform(r, c)
+            if map_data.grid[image] != map_data.grid[r, c]:
+                break
+            if map_data.portal_ids.get((r, c)) != map_data.portal_ids.get(image):
+                break
+            if tile != Tile.WATER:
+                mapping[(r, c)] = image
+        else:
+            symmetries.append(mapping)
+    return symmetries
@@ -1,9 +1,9 @@
 from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple
+from typing import Dict, List
 
 import pulp
 
-from .graph import build_adjacency, candidate_tiles
+from .graph import grid_graph, prune_tiles, tile_values
 from .parser import Coord, MapData
 
 
@@ -23,111 +23,98 @@ class SolverResult:
         return sum(1 for state in self.assignments.values() if state == "pasture")
 
 
-def _boundary_coords(map_data: MapData, coords: Iterable[Coord]) -> set[Coord]:
-    return {
-        (r, c)
-        for r, c in coords
-        if r in (0, map_data.height - 1) or c in (0, map_data.width - 1)
-    }
-
-
 def solve_ilp(map_data: MapData, max_walls: int) -> SolverResult:
-    candidates = candidate_tiles(map_data)
-    adjacency = build_adjacency(map_data)
+    # Variables live in lists indexed by the graph's integer tile ids; coordinates are only used for names and results.
+    graph = grid_graph(map_data)
+    coords = graph.coords
+    n = graph.num_nodes
 
-    root = map_data.horse
-    nodes = set(candidates)
+    root = graph.ids[map_data.horse]
 
     problem = pulp.LpProblem("horse_enclosure", pulp.LpMaximize)
 
-    wall_vars: Dict[Coord, pulp.LpVariable] = {}
-    inside_vars: Dict[Coord, pulp.LpVariable] = {}
-
-    boundary_candidates = _boundary_coords(map_data, candidates)
-    no_wall_coords = (
-        set(map_data.portal_ids)
-        | set(map_data.cherries)
-        | set(map_data.golden_apples)
-        | set(map_data.bees)
-        | {root}
-    )
-
-    for r, c in candidates:
-        wall_vars[(r, c)] = pulp.LpVariable(f"b_wall_{r}_{c}", lowBound=0, upBound=1, cat="Binary")
-        inside_vars[(r, c)] = pulp.LpVariable(f"x_inside_{r}_{c}", lowBound=0, upBound=1, cat="Binary")
-
-        # Inside region and wall are mutually exclusive.
-        problem += wall_vars[(r, c)] + inside_vars[(r, c)] <= 1
-
-        # Portals, cherries, golden apples, bees, and horse cannot be walls.
-        if (r, c) in no_wall_coords:
-            problem += wall_vars[(r, c)] == 0
-
-        # Boundary tiles cannot be part of the inside region.
-        if (r, c) in boundary_candidates and (r, c) != root:
-            problem += inside_vars[(r, c)] == 0
-
-    # Horse is always inside and not a wall.
-    problem += inside_vars[root] == 1
-    problem += wall_vars[root] == 0
-
-    # Objective: maximize inside tiles (including horse) + tile bonuses.
-    cherry_bonus = pulp.lpSum(3 * inside_vars[(r, c)] for r, c in map_data.cherries)
-    golden_bonus = pulp.lpSum(10 * inside_vars[(r, c)] for r, c in map_data.golden_apples)
-    bee_penalty = pulp.lpSum(5 * inside_vars[(r, c)] for r, c in map_data.bees)
-    problem += pulp.lpSum(inside_vars[(r, c)] for r, c in candidates) + cherry_bonus + golden_bonus - bee_penalty
+    # Only interior tiles connected to the horse can be inside, and only walls next to them can matter (see
+    # prune_tiles); this also covers boundary tiles and the portal, cherry, golden apple, bee, and horse no-wall rule.
+    enclosable_coords, wallable_coords = prune_tiles(map_data)
+    enclosable = [coord in enclosable_coords for coord in coords]
+
+    # Each variable family is created in one LpVariable.matrix call, named by tile coordinates and indexed by tile id.
+    tile_names = [f"{r}_{c}" for r, c in coords]
+    wall_vars: List[pulp.LpVariable] = pulp.LpVariable.matrix("b_wall", tile_names, 0, 1, cat="Binary")
+    inside_vars: List[pulp.LpVariable] = pulp.LpVariable.matrix("x_inside", tile_names, 0, 1, cat="Binary")
+    # Fixed tiles are expressed as variable bounds rather than equality rows, so CBC never sees those rows.
+    for u, (wall, inside) in enumerate(zip(wall_vars, inside_vars)):
+        coord = coords[u]
+
+        if coord not in wallable_coords:
+            wall.upBound = 0
+
+        # The horse is always inside.
+        if u == root:
+            inside.lowBound = 1
+        elif not enclosable[u]:
+            inside.upBound = 0
+
+        # Inside region and wall are mutually exclusive (already implied when either is fixed to 0).
+        if wall.upBound != 0 and inside.upBound != 0:
+            problem += wall + inside <= 1
+
+    # Objective: maximize inside tiles (including horse) + tile bonuses. Large sums are built as a single
+    # coefficient dict rather than through lpSum, which merges one term at a time.
+    values = tile_values(map_data)
+    problem += pulp.LpAffineExpression(zip(inside_vars, [values[coord] for coord in coords]))
 
     # Wall budget.
-    problem += pulp.lpSum(wall_vars[(r, c)] for r, c in candidates) <= max_walls
-
-    # Separation constraints: if inside differs across an edge, at least one wall must be present.
-    handled_edges: set[Tuple[Coord, Coord]] = set()
-    for r, c in adjacency:
-        for nr, nc in adjacency[(r, c)]:
-            edge = tuple(sorted(((r, c), (nr, nc))))
-            if edge in handled_edges:
-                continue
-            handled_edges.add(edge)
-            ir = inside_vars[(r, c)]
-            inr = inside_vars[(nr, nc)]
-            wr = wall_vars[(r, c)]
-            wnr = wall_vars[(nr, nc)]
-            problem += ir - inr <= wr + wnr
-            problem += inr - ir <= wr + wnr
+    problem += pulp.LpAffineExpression((wall, 1) for wall in wall_vars) <= max_walls
+
+    # Separation constraints: if inside differs across an edge, at least one wall must be present. Edges with no
+    # enclosable endpoint have both sides fixed outside, so they need no rows.
+    edges = [(u, v) for u, v in graph.edges.tolist() if enclosable[u] or enclosable[v]]
+    for u, v in edges:
+        walls = wall_vars[u] + wall_vars[v]
+        problem += inside_vars[u] - inside_vars[v] <= walls
+        problem += inside_vars[v] - inside_vars[u] <= walls
 
     # Connectivity / enclosure via single-commodity flow to keep inside region attached to horse and away from boundary.
-    big_m = len(candidates) + 1
-    flow_vars: Dict[Tuple[Coord, Coord], pulp.LpVariable] = {}
-    for r, c in adjacency: # for every candidate tile
-        for nr, nc in adjacency[(r, c)]: # for every neighbor of that tile
-            flow_vars[(r, c), (nr, nc)] = pulp.LpVariable(
-                f"f_{r}_{c}__{nr}_{nc}", lowBound=0, upBound=big_m, cat="Continuous"
-            ) # define how much flow is going from (r,c) to (nr,nc)
-            # Capacity respects inside status and walls on the source node (when applicable).
-            problem += flow_vars[(r, c), (nr, nc)] <= big_m * inside_vars[(r, c)] # if the source is not inside, no flow can go out of it
-            problem += flow_vars[(r, c), (nr, nc)] <= big_m * (1 - wall_vars[(r, c)]) # if the source is a wall, no flow can go out of it
-
-    total_inside = pulp.lpSum(inside_vars[(r, c)] for r, c in candidates if (r, c) != root)
-
-    for node in nodes:
+    # No arc carries more than one unit per inside tile other than the horse, and only enclosable tiles can be inside.
+    big_m = max(len(enclosable_coords) - 1, 0)
+    in_flows: List[List[pulp.LpVariable]] = [[] for _ in range(n)]
+    out_flows: List[List[pulp.LpVariable]] = [[] for _ in range(n)]
+    # Tiles that can never be inside carry no flow, so arcs only join enclosable tiles.
+    arcs = [arc for u, v in edges if enclosable[u] and enclosable[v] for arc in ((u, v), (v, u))]
+    # how much flow is going from src to dst, one variable per arc; named by arc index (f_<i> is arcs[i]), since
+    # PuLP only needs unique names and formatting two coordinates per arc is a visible share of the build time
+    flows = pulp.LpVariable.matrix("f", range(len(arcs)), 0, big_m, cat="Continuous")
+    for (src, dst), flow in zip(arcs, flows):
+        out_flows[src].append(flow)
+        in_flows[dst].append(flow)
+        # Capacity respects inside status on the source node: if the source is not inside, no flow can go out of it.
+        # Walls are never inside (wall + inside <= 1), so this also blocks flow out of walls.
+        problem += flow <= big_m * inside_vars[src]
+
+    for node in range(n):
+        if not enclosable[node]:
+            continue
         # Work out flow conservation / generation at each node, based on flows in and out.
-        incoming = pulp.lpSum(flow_vars[(u, v)] for (u, v) in flow_vars if v == node)
-        outgoing = pulp.lpSum(flow_vars[(u, v)] for (u, v) in flow_vars if u == node)
         if node == root:
             # Source pushes flow equal to number of inside tiles (excluding the horse).
-            problem += outgoing - incoming == total_inside
+            terms = [(flow, 1) for flow in out_flows[node]] + [(flow, -1) for flow in in_flows[node]]
+            terms += [(inside_vars[u], -1) for u in range(n) if u != root and enclosable[u]]
         else:
-            problem += incoming - outgoing == inside_vars[node] # each inside node (not horse) consumes 1 unit of flow
+            # Each inside node (not horse) consumes 1 unit of flow.
+            terms = [(flow, 1) for flow in in_flows[node]] + [(flow, -1) for flow in out_flows[node]]
+            terms.append((inside_vars[node], -1))
+        problem += pulp.LpAffineExpression(terms) == 0
 
     solver = pulp.PULP_CBC_CMD(msg=False)
     problem.solve(solver)
 
     status = pulp.LpStatus.get(problem.status, "Unknown")
     assignments: Dict[Coord, Assignment] = {}
-    for coord in candidates:
-        if wall_vars[coord].value() >= 0.5:
+    for coord, wall, inside in zip(coords, wall_vars, inside_vars):
+        if wall.value() >= 0.5:
             assignments[coord] = "wall"
-        elif inside_vars[coord].value() >= 0.5:
+        elif inside.value() >= 0.5:
             assignments[coord] = "pasture"
         else:
             assignments[coord] = "grass"
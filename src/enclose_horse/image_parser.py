@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from importlib import resources
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
 
 import numpy as np
 from PIL import Image
 
-from .parser import MapData, Tile, parse_map_file
+from .parser import TILE_CODES, MapData, Tile, mask_coords, parse_map_file
 
 
 @dataclass
@@ -30,11 +32,14 @@ class GridDetection:
 
 def _load_image(path: Path | str) -> np.ndarray:
     img = Image.open(path).convert("RGB")
-    return np.asarray(img).astype(np.float32) / 255.0
+    # One uint8 -> float32 pass; casting first and then dividing would allocate and sweep a second float32 image.
+    return np.divide(np.asarray(img), np.float32(255.0), dtype=np.float32)
 
 
 def _dominant_period(profile: np.ndarray, min_period: int = 30, max_period: int = 100) -> int:
     profile = profile - profile.mean()
+    # Profiles are a few thousand samples, so numpy's rfft takes tens of microseconds. Zero-padding to a fast FFT length
+    # would move the frequency bins that periods are read from.
     spectrum = np.abs(np.fft.rfft(profile))
     spectrum[0] = 0.0
     if spectrum.size < 2 or spectrum.max() == 0:
@@ -53,60 +58,86 @@ def _dominant_period(profile: np.ndarray, min_period: int = 30, max_period: int
     return round(periods[peak_idx])
 
 
-def _best_offset_and_count(
-    profile: np.ndarray, pitch: int, min_count: int = 15, max_count: int = 30
-) -> Tuple[int, int, float]:
-    if pitch <= 0:
-        return 0, max(min_count, 1), -1.0
-    best_offset = 0
-    best_count = max(min_count, 1)
-    best_score = -1.0
-    for offset in range(0, pitch):
-        for count in range(min_count, max_count + 1):
-            positions = offset + np.arange(count) * pitch
-            positions = positions[positions < len(profile)]
-            if positions.size == 0:
-                continue
-            idx = np.clip(np.rint(positions).astype(int), 0, len(profile) - 1)
-            score = profile[idx].sum() + 0.1 * positions.size
-            if score > best_score:
-                best_score = score
-                best_offset = offset
-                best_count = positions.size
-    return best_offset, best_count, best_score
-
-
-def detect_grid(image: np.ndarray) -> GridDetection:
-    """Detect grid spacing and offsets using gradient projections."""
-    gray = image.mean(axis=2)
-    grad_x = np.abs(np.diff(gray, axis=1))  # vertical lines cause horizontal gradients
-    grad_y = np.abs(np.diff(gray, axis=0))  # horizontal lines cause vertical gradients
-
-    vert_profile = grad_x.mean(axis=0)
-    horiz_profile = grad_y.mean(axis=1)
+def _best_pitch_offset_and_count(
+    profile: np.ndarray, pitches: Sequence[int], min_count: int = 15, max_count: int = 30
+) -> Tuple[int, int, int, float]:
+    """Best (pitch, offset, count, score) over positive candidate ``pitches``; (0, 0, 0, -1.0) if none beats -1."""
+    # Score every (pitch, offset, count) triple at once: entry [p, offset] holds the line positions offset,
+    # offset + pitch, ..., and a running sum along it gives the score of every count prefix. Offsets at or past a
+    # pitch and positions past the profile end add nothing. The tensor is ~14 x 100 x 30, so this takes about half a
+    # millisecond per profile; a compiled scalar loop would not pay for a numba dependency.
+    pitch_arr = np.asarray(pitches)[:, None, None]
+    offsets = np.arange(pitch_arr.max())[None, :, None]
+    positions = offsets + np.arange(max_count)[None, None, :] * pitch_arr
+    in_range = (positions < len(profile)) & (offsets < pitch_arr)
+    values = np.where(in_range, profile[np.minimum(positions, len(profile) - 1)], 0.0)
+    counts = np.arange(min_count, max_count + 1)
+    sizes = np.minimum(counts, in_range.sum(axis=2, keepdims=True))
+    scores = np.cumsum(values, axis=2)[:, :, counts - 1] + 0.1 * sizes
+    scores[sizes == 0] = -np.inf
+    # argmax returns the first maximum in (pitch, offset, count) order, matching a scan over the candidates that
+    # only keeps strict improvements.
+    best = np.unravel_index(np.argmax(scores), scores.shape)
+    best_score = float(scores[best])
+    if best_score <= -1.0:
+        return 0, 0, 0, -1.0
+    return int(pitches[best[0]]), int(best[1]), int(sizes[best]), best_score
+
+
+def _gradient_profiles(gray: np.ndarray, block_rows: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """Column means of |horizontal gradient| and row means of |vertical gradient| of a 2-D image.
+
+    Vertical grid lines cause horizontal gradients and vice versa. The gradients are taken a band of rows at a
+    time into reused buffers, so no full-resolution gradient image is materialised.
+    """
+    height, width = gray.shape
+    col_sums = np.zeros(max(width - 1, 0), dtype=gray.dtype)
+    row_means = np.empty(max(height - 1, 0), dtype=gray.dtype)
+    grad_x = np.empty((block_rows, max(width - 1, 0)), dtype=gray.dtype)
+    grad_y = np.empty((block_rows, width), dtype=gray.dtype)
+    for r0 in range(0, height, block_rows):
+        band = gray[r0 : r0 + block_rows]
+        gx = grad_x[: len(band)]
+        np.abs(np.subtract(band[:, 1:], band[:, :-1], out=gx), out=gx)
+        col_sums += gx.sum(axis=0)
+        # Row pairs (r, r + 1) whose first row lies in this band; the last band has one fewer.
+        band = gray[r0 : r0 + block_rows + 1]
+        gy = grad_y[: len(band) - 1]
+        np.abs(np.subtract(band[1:], band[:-1], out=gy), out=gy)
+        row_means[r0 : r0 + len(gy)] = gy.mean(axis=1)
+    return col_sums / height, row_means
+
+
+def detect_grid(image: np.ndarray, cols: int | None = None, rows: int | None = None) -> GridDetection:
+    """Detect grid spacing and offsets using gradient projections.
+
+    ``cols``/``rows`` fix the grid size when it is already known (e.g. from a labelled map); otherwise it is derived
+    from the image size. Pitch and offset are searched either way: they are scored over a range of line counts, and
+    pinning that range to the known size was measured to pick worse pitches and offsets.
+    """
+    image = np.asarray(image, dtype=np.float32)  # no copy for _load_image output; keeps the profiles float32
+    # Same float32 values as image.mean(axis=2), but numpy reduces a length-3 trailing axis far slower than it adds
+    # three strided planes. The full-resolution image is kept: pitches and offsets need single-pixel accuracy.
+    gray = (image[..., 0] + image[..., 1] + image[..., 2]) / 3
+    vert_profile, horiz_profile = _gradient_profiles(gray)
 
     pitch_x = _dominant_period(vert_profile)
     pitch_y = _dominant_period(horiz_profile)
     if pitch_x <= 0 or pitch_y <= 0:
         raise ValueError("Failed to detect grid period.")
 
-    def _search(profile: np.ndarray, base_pitch: int) -> Tuple[int, int, int]:
-        best = (0, 0, 0, -1.0)  # pitch, offset, count, score
-        for cand_pitch in range(max(30, base_pitch - 6), min(100, base_pitch + 7)):
-            off, count, score = _best_offset_and_count(profile, cand_pitch)
-            if score > best[3]:
-                best = (cand_pitch, off, count, score)
-        # also try double pitch to avoid halving the grid
-        double_pitch = min(120, base_pitch * 2)
-        off_double, count_double, score_double = _best_offset_and_count(profile, double_pitch)
-        if score_double > best[3]:
-            best = (double_pitch, off_double, count_double, score_double)
-        return best[0], best[1], best[2]
-
-    pitch_x, offset_x, cols = _search(vert_profile, pitch_x)
-    pitch_y, offset_y, rows = _search(horiz_profile, pitch_y)
-    cols = max(1, round((image.shape[1] - 2 * offset_x) / pitch_x))
-    rows = max(1, round((image.shape[0] - 2 * offset_y) / pitch_y))
+    def _search(profile: np.ndarray, base_pitch: int) -> Tuple[int, int]:
+        pitches = list(range(max(30, base_pitch - 6), min(100, base_pitch + 7)))
+        pitches.append(min(120, base_pitch * 2))  # also try double pitch to avoid halving the grid
+        pitch, offset, _, _ = _best_pitch_offset_and_count(profile, pitches)
+        return pitch, offset
+
+    pitch_x, offset_x = _search(vert_profile, pitch_x)
+    pitch_y, offset_y = _search(horiz_profile, pitch_y)
+    if cols is None:
+        cols = max(1, round((image.shape[1] - 2 * offset_x) / pitch_x))
+    if rows is None:
+        rows = max(1, round((image.shape[0] - 2 * offset_y) / pitch_y))
     return GridDetection(offset_x, offset_y, pitch_x, pitch_y, cols, rows)
 
 
@@ -124,11 +155,56 @@ def _cell_patch(image: np.ndarray, grid: GridDetection, row: int, col: int, crop
     return patch
 
 
+def _moment_features(pixels: np.ndarray) -> np.ndarray:
+    """Per-channel mean and variance (``(..., 6)`` float32) of ``(..., 3, n)`` pixel values.
+
+    Both moments come from one pass of float64 sums of x and x**2; float64 keeps ``E[x^2] - mean^2`` free of the
+    cancellation float32 would show on near-uniform cells.
+    """
+    n = pixels.shape[-1]
+    mean = pixels.sum(axis=-1, dtype=np.float64) / n
+    var = np.einsum("...k,...k->...", pixels, pixels, dtype=np.float64) / n - mean * mean
+    return np.concatenate([mean, np.maximum(var, 0.0)], axis=-1).astype(np.float32)
+
+
 def _features(patch: np.ndarray) -> np.ndarray:
-    flat = patch.reshape(-1, 3)
-    mean = flat.mean(axis=0)
-    var = flat.var(axis=0)
-    return np.concatenate([mean, var])
+    return _moment_features(patch.reshape(-1, 3).T)
+
+
+def _cell_features(image: np.ndarray, grid: GridDetection, crop_ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Features (``(rows, cols, 6)``) and brightest value (``(rows, cols)``) of every cell's cropped patch.
+
+    Cells whose crop window lies fully inside the image share one window size, so they are gathered into a single
+    ``(rows, cols, 3, ph, pw)`` array and reduced at once. Cells clipped by the image edge fall back to
+    ``_cell_patch``, which shrinks or replaces their window.
+    """
+    dy = int(grid.pitch_y * (1 - crop_ratio) / 2)
+    dx = int(grid.pitch_x * (1 - crop_ratio) / 2)
+    ph, pw = grid.pitch_y - 2 * dy, grid.pitch_x - 2 * dx
+    ys = grid.offset_y + np.arange(grid.rows) * grid.pitch_y + dy
+    xs = grid.offset_x + np.arange(grid.cols) * grid.pitch_x + dx
+    row_ok = ys + ph + dy <= image.shape[0]
+    col_ok = xs + pw + dx <= image.shape[1]
+
+    feats = np.empty((grid.rows, grid.cols, 6), dtype=np.float32)
+    brightness = np.empty((grid.rows, grid.cols), dtype=np.float32)
+    if ph > 0 and pw > 0 and row_ok.any() and col_ok.any():
+        windows = np.lib.stride_tricks.sliding_window_view(image, (ph, pw), axis=(0, 1))
+        rows_in, cols_in = np.flatnonzero(row_ok), np.flatnonzero(col_ok)
+        tiles = windows[ys[rows_in][:, None], xs[cols_in][None, :]]  # (rows_in, cols_in, 3, ph, pw)
+        # The gather keeps the image's interleaved channels; one contiguous copy gives every reduction unit stride.
+        pixels = np.ascontiguousarray(tiles).reshape(len(rows_in), len(cols_in), 3, ph * pw)
+        block = np.ix_(rows_in, cols_in)
+        feats[block] = _moment_features(pixels)
+        brightness[block] = pixels.max(axis=(2, 3))
+    for r in range(grid.rows):
+        for c in range(grid.cols):
+            if ph > 0 and pw > 0 and row_ok[r] and col_ok[c]:
+                continue
+            patch = _cell_patch(image, grid, r, c, crop_ratio)
+            feats[r, c] = _features(patch)
+            brightness[r, c] = patch.max()
+    return feats, brightness
 
 
 def _collect_calibration_features(
@@ -136,24 +212,15 @@ def _collect_calibration_features(
 ) -> Dict[str, List[np.ndarray]]:
     image = _load_image(image_path)
     map_data = parse_map_file(map_path)
-    grid = detect_grid(image)
-
     # If grid detection is close but not exact, force rows/cols to map shape.
-    grid = GridDetection(
-        offset_x=grid.offset_x,
-        offset_y=grid.offset_y,
-        pitch_x=grid.pitch_x,
-        pitch_y=grid.pitch_y,
-        cols=map_data.width,
-        rows=map_data.height,
-    )
+    grid = detect_grid(image, cols=map_data.width, rows=map_data.height)
 
+    feats, _ = _cell_features(image, grid, crop_ratio)
     buckets: Dict[str, List[np.ndarray]] = {}
     for r in range(map_data.height):
         for c in range(map_data.width):
-            patch = _cell_patch(image, grid, r, c, crop_ratio)
-            feat = _features(patch)
-            tile = map_data.grid[r][c]
+            feat = feats[r, c]
+            tile = map_data.tile(r, c)
             if tile == Tile.PORTAL:
                 key = f"portal_{map_data.portal_ids[(r, c)]}"
             else:
@@ -166,10 +233,14 @@ def calibrate_color_stats_multi(
     pairs: Iterable[Tuple[Path | str, Path | str]], crop_ratio: float = 0.6
 ) -> Dict[str, List[float]]:
     """Compute 6D (mean+var) color stats per tile using multiple image/map pairs."""
+    pairs = list(pairs)
     merged: Dict[str, List[np.ndarray]] = {}
     all_feats: List[np.ndarray] = []
-    for image_path, map_path in pairs:
-        buckets = _collect_calibration_features(image_path, map_path, crop_ratio)
+    # Pairs are independent, and image decoding and the numpy feature math release the GIL, so threads overlap them
+    # without the interpreter start-up a process pool pays per worker. map keeps pair order, so stats are unchanged.
+    with ThreadPoolExecutor(max_workers=max(1, min(len(pairs), os.cpu_count() or 1))) as pool:
+        all_buckets = list(pool.map(lambda pair: _collect_calibration_features(*pair, crop_ratio), pairs))
+    for buckets in all_buckets:
         for key, feats in buckets.items():
             merged.setdefault(key, []).extend(feats)
             all_feats.extend(feats)
@@ -208,109 +279,100 @@ def _load_default_stats_text() -> str:
         ) from exc
 
 
-def load_stats(path: Path | str | None = None) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+@dataclass(frozen=True)
+class ColorModels:
+    """Calibrated tile prototypes: row i of ``prototypes`` (float32, one column per feature) is ``labels[i]``."""
+
+    labels: Tuple[str, ...]
+    prototypes: np.ndarray
+
+    @classmethod
+    def from_dict(cls, models: Mapping[str, Sequence[float]]) -> ColorModels:
+        labels = tuple(models)
+        if not labels:
+            return cls(labels=labels, prototypes=np.empty((0, 6), dtype=np.float32))
+        prototypes = np.array([models[label] for label in labels], dtype=np.float32).reshape(len(labels), -1)
+        return cls(labels=labels, prototypes=prototypes)
+
+
+def load_stats(path: Path | str | None = None) -> Tuple[ColorModels, np.ndarray]:
     if path is None:
         data_text = _load_default_stats_text()
     else:
         data_text = Path(path).read_text()
     data = json.loads(data_text)
-    scale = np.asarray(data.get("_scale", [1.0] * 6), dtype=np.float32)
-    prototypes = {k: np.asarray(v, dtype=np.float32) for k, v in data.items() if k != "_scale"}
-    return prototypes, scale
+    scale = np.asarray(data.pop("_scale", [1.0] * 6), dtype=np.float32)
+    return ColorModels.from_dict(data), scale
+
+
+def _nearest_labels(feats: np.ndarray, models: ColorModels, scale: np.ndarray) -> np.ndarray:
+    """Index into ``models.labels`` of the nearest prototype (scaled Euclidean distance) for each row of ``feats``.
+
+    Ties keep model order; every index is 0 when there are no models.
+    """
+    if not models.labels:
+        return np.zeros(len(feats), dtype=np.intp)
+    diffs = (feats[:, None, :] - models.prototypes[None, :, :]) / scale
+    dists = np.einsum("ijk,ijk->ij", diffs, diffs)
+    return dists.argmin(axis=1)
+
 
+# Tile code for each calibration label; "portal_<id>" labels are portals and unknown labels read as grass.
+_LABEL_CODES: Dict[str, int] = {tile.value: code for tile, code in TILE_CODES.items()}
 
-def _nearest_label(feat: np.ndarray, models: Dict[str, np.ndarray], scale: np.ndarray) -> str:
-    best = None
-    best_dist = float("inf")
-    for label, proto in models.items():
-        diff = (feat - proto) / scale
-        dist = np.linalg.norm(diff)
-        if dist < best_dist:
-            best = label
-            best_dist = dist
-    return best or "."
+
+def _label_code(label: str) -> Tuple[int, int]:
+    """Tile code and portal id (-1 when not a numbered portal) of a calibration label."""
+    if label.startswith("portal_"):
+        return TILE_CODES[Tile.PORTAL], int(label.split("_")[1])
+    return _LABEL_CODES.get(label, TILE_CODES[Tile.GRASS]), -1
 
 
 def classify_image(
-    image_path: Path | str, models: Dict[str, np.ndarray], scale: np.ndarray, crop_ratio: float = 0.6
+    image_path: Path | str,
+    models: ColorModels | Mapping[str, Sequence[float]],
+    scale: np.ndarray,
+    crop_ratio: float = 0.6,
 ) -> Tuple[MapData, np.ndarray]:
-    """Parse an image into MapData using calibrated color models."""
+    """Parse an image into MapData using calibrated color models (a plain label -> prototype mapping also works)."""
+    if not isinstance(models, ColorModels):
+        models = ColorModels.from_dict(models)
     image = _load_image(image_path)
     grid = detect_grid(image)
 
-    labels: List[List[str]] = []
-    brightness: List[Tuple[float, Tuple[int, int], str]] = []
-    predicted_horses: List[Tuple[float, Tuple[int, int]]] = []
-    for r in range(grid.rows):
-        row_labels: List[str] = []
-        for c in range(grid.cols):
-            patch = _cell_patch(image, grid, r, c, crop_ratio)
-            feat = _features(patch)
-            label = _nearest_label(feat, models, scale)
-            row_labels.append(label)
-            bright = float(patch.max())
-            brightness.append((bright, (r, c), label))
-            if label == Tile.HORSE.value:
-                predicted_horses.append((bright, (r, c)))
-        labels.append(row_labels)
-
-    # Enforce a single horse by preferring cells classified as horse; otherwise brightest.
-    if predicted_horses:
-        horse_r, horse_c = max(predicted_horses, key=lambda t: t[0])[1]
-    else:
-        horse_r, horse_c = max(brightness, key=lambda t: t[0])[1] if brightness else (0, 0)
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if (r, c) == (horse_r, horse_c):
-                labels[r][c] = Tile.HORSE.value
-            elif labels[r][c] == Tile.HORSE.value:
-                labels[r][c] = Tile.GRASS.value
-
-    portals: Dict[int, List[Tuple[int, int]]] = {}
-    portal_ids: Dict[Tuple[int, int], int] = {}
-    cherries: List[Tuple[int, int]] = []
-    golden_apples: List[Tuple[int, int]] = []
-    bees: List[Tuple[int, int]] = []
-    horse: Tuple[int, int] | None = None
-
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            label = labels[r][c]
-            if label.startswith("portal_"):
-                pid = int(label.split("_")[1])
-                portals.setdefault(pid, []).append((r, c))
-                portal_ids[(r, c)] = pid
-                labels[r][c] = Tile.PORTAL.value
-            elif label == Tile.CHERRY.value:
-                cherries.append((r, c))
-            elif label == Tile.GOLDEN_APPLE.value:
-                golden_apples.append((r, c))
-            elif label == Tile.BEE.value:
-                bees.append((r, c))
-            elif label == Tile.HORSE.value:
-                horse = (r, c)
-
-    if horse is None:
+    feats, cell_brightness = _cell_features(image, grid, crop_ratio)
+    if cell_brightness.size == 0:
         raise ValueError("Horse not detected in screenshot.")
-
-    grid_tiles: List[List[Tile]] = []
-    for r in range(grid.rows):
-        row: List[Tile] = []
-        for c in range(grid.cols):
-            ch = labels[r][c]
-            row.append(Tile(ch) if ch in {t.value for t in Tile} else Tile.GRASS)
-        grid_tiles.append(row)
+    # Dispatch through per-label tables once, then gather them for every cell.
+    label_codes, label_portal_ids = zip(*(_label_code(label) for label in models.labels or (Tile.GRASS.value,)))
+    nearest = _nearest_labels(feats.reshape(-1, feats.shape[-1]), models, scale).reshape(grid.rows, grid.cols)
+    codes = np.asarray(label_codes, dtype=np.int8)[nearest]
+    cell_portal_ids = np.asarray(label_portal_ids)[nearest]
+
+    # Enforce a single horse by preferring the brightest cell classified as horse; otherwise the brightest cell.
+    predicted_horses = codes == TILE_CODES[Tile.HORSE]
+    candidates = np.where(predicted_horses, cell_brightness, -np.inf) if predicted_horses.any() else cell_brightness
+    horse = np.unravel_index(np.argmax(candidates), candidates.shape)
+    codes[predicted_horses] = TILE_CODES[Tile.GRASS]
+    codes[horse] = TILE_CODES[Tile.HORSE]
+    cell_portal_ids[horse] = -1
+
+    portal_mask = cell_portal_ids >= 0
+    portal_ids: Dict[Tuple[int, int], int] = dict(zip(mask_coords(portal_mask), cell_portal_ids[portal_mask].tolist()))
+    portals: Dict[int, List[Tuple[int, int]]] = {}
+    for coord, portal_id in portal_ids.items():
+        portals.setdefault(portal_id, []).append(coord)
 
     map_data = MapData(
-        grid=grid_tiles,
+        grid=codes,
         width=grid.cols,
         height=grid.rows,
-        horse=horse,
+        horse=(int(horse[0]), int(horse[1])),
         portals=portals,
         portal_ids=portal_ids,
-        cherries=cherries,
-        golden_apples=golden_apples,
-        bees=bees,
+        cherries=mask_coords(codes == TILE_CODES[Tile.CHERRY]),
+        golden_apples=mask_coords(codes == TILE_CODES[Tile.GOLDEN_APPLE]),
+        bees=mask_coords(codes == TILE_CODES[Tile.BEE]),
     )
     return map_data, image
 
@@ -320,7 +382,7 @@ def map_to_string(map_data: MapData) -> str:
     for r in range(map_data.height):
         line_chars: List[str] = []
         for c in range(map_data.width):
-            tile = map_data.grid[r][c]
+            tile = map_data.tile(r, c)
             if tile == Tile.PORTAL:
                 line_chars.append(str(map_data.portal_ids[(r, c)]))
             else:
@@ -3,6 +3,8 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
+import numpy as np
+
 
 class Tile(str, Enum):
     WATER = "~"
@@ -16,10 +18,18 @@ class Tile(str, Enum):
 
 Coord = Tuple[int, int]
 
+# Edge-neighbour offsets, in the order MapData.neighbors yields them.
+NEIGHBOR_DELTAS: Tuple[Coord, ...] = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Integer codes for tiles in MapData.grid, in Tile declaration order.
+TILE_CODES: Dict[Tile, int] = {tile: code for code, tile in enumerate(Tile)}
+_TILES_BY_CODE: Tuple[Tile, ...] = tuple(Tile)
 
-@dataclass(frozen=True)
+
+# eq=False keeps identity hashing, so derived graph structures can be cached per map instance.
+@dataclass(frozen=True, eq=False)
 class MapData:
-    grid: List[List[Tile]]
+    grid: np.ndarray  # (height, width) int8 TILE_CODES; use tile() or tiles() for Tile values
     width: int
     height: int
     horse: Coord
@@ -30,16 +40,42 @@ class MapData:
     bees: List[Coord]
 
     def neighbors(self, row: int, col: int) -> Iterable[Coord]:
-        deltas = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in deltas:
+        for dr, dc in NEIGHBOR_DELTAS:
             nr, nc = row + dr, col + dc
             if 0 <= nr < self.height and 0 <= nc < self.width:
                 yield nr, nc
 
+    def tile(self, row: int, col: int) -> Tile:
+        return _TILES_BY_CODE[self.grid[row, col]]
+
     def tiles(self) -> Iterable[Tuple[int, int, Tile]]:
-        for r in range(self.height):
-            for c in range(self.width):
-                yield r, c, self.grid[r][c]
+        for r, row in enumerate(self.grid.tolist()):
+            for c, code in enumerate(row):
+                yield r, c, _TILES_BY_CODE[code]
+
+    def tile_array(self) -> np.ndarray:
+        """The grid as an int8 ``(height, width)`` array of TILE_CODES; a fresh copy on every call."""
+        return self.grid.copy()
+
+
+# Map characters to TILE_CODES through a lookup table indexed by code point; unknown characters map to -1.
+_CHAR_CODES = np.full(128, -1, dtype=np.int8)
+for _tile in Tile:
+    if _tile != Tile.PORTAL:
+        _CHAR_CODES[ord(_tile.value)] = TILE_CODES[_tile]
+_CHAR_CODES[ord("0") : ord("9") + 1] = TILE_CODES[Tile.PORTAL]
+
+
+def _decode_rows(lines: List[str], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Code points and tile codes (-1 for unknown characters) of equal-width lines, each shaped (rows, width)."""
+    chars = np.frombuffer("".join(lines).encode("utf-32-le"), dtype=np.uint32).reshape(len(lines), width)
+    codes = np.where(chars < len(_CHAR_CODES), _CHAR_CODES[np.minimum(chars, len(_CHAR_CODES) - 1)], -1)
+    return chars, codes
+
+
+def mask_coords(mask: np.ndarray) -> List[Coord]:
+    """Row-major (row, col) coordinates of the True cells of a 2-D mask."""
+    return [(r, c) for r, c in np.argwhere(mask).tolist()]
 
 
 def parse_map_file(path: Path | str) -> MapData:
@@ -48,59 +84,39 @@ def parse_map_file(path: Path | str) -> MapData:
         raise ValueError("Map is empty.")
 
     width = len(raw_lines[0])
-    grid: List[List[Tile]] = []
-    horse: Coord | None = None
-    portals: Dict[int, List[Coord]] = {}
-    portal_ids: Dict[Coord, int] = {}
-    cherries: List[Coord] = []
-    golden_apples: List[Coord] = []
-    bees: List[Coord] = []
-
-    for row_idx, line in enumerate(raw_lines):
-        if len(line) != width:
-            raise ValueError(f"Inconsistent row width at line {row_idx}: expected {width}, got {len(line)}")
-
-        row: List[Tile] = []
-        for col_idx, ch in enumerate(line):
-            if ch == Tile.WATER.value:
-                row.append(Tile.WATER)
-            elif ch == Tile.GRASS.value:
-                row.append(Tile.GRASS)
-            elif ch == Tile.HORSE.value:
-                if horse is not None:
-                    raise ValueError("Multiple horses found in map.")
-                horse = (row_idx, col_idx)
-                row.append(Tile.HORSE)
-            elif ch == Tile.CHERRY.value:
-                cherries.append((row_idx, col_idx))
-                row.append(Tile.CHERRY)
-            elif ch == Tile.GOLDEN_APPLE.value:
-                golden_apples.append((row_idx, col_idx))
-                row.append(Tile.GOLDEN_APPLE)
-            elif ch == Tile.BEE.value:
-                bees.append((row_idx, col_idx))
-                row.append(Tile.BEE)
-            elif ch.isdigit():
-                portal_id = int(ch)
-                coord = (row_idx, col_idx)
-                portals.setdefault(portal_id, []).append(coord)
-                portal_ids[coord] = portal_id
-                row.append(Tile.PORTAL)
-            else:
-                raise ValueError(f"Unexpected tile '{ch}' at {(row_idx, col_idx)}")
-        grid.append(row)
-
-    if horse is None:
+    bad_width = next((row_idx for row_idx, line in enumerate(raw_lines) if len(line) != width), None)
+    # Rows before the first width mismatch decode as one array; errors are reported in row-major scan order.
+    chars, codes = _decode_rows(raw_lines[:bad_width], width)
+
+    unknown = mask_coords(codes < 0)[:1]
+    horses = mask_coords(codes == TILE_CODES[Tile.HORSE])
+    if len(horses) > 1 and (not unknown or horses[1] < unknown[0]):
+        raise ValueError("Multiple horses found in map.")
+    if unknown:
+        row_idx, col_idx = unknown[0]
+        raise ValueError(f"Unexpected tile '{chr(chars[row_idx, col_idx])}' at {(row_idx, col_idx)}")
+    if bad_width is not None:
+        raise ValueError(
+            f"Inconsistent row width at line {bad_width}: expected {width}, got {len(raw_lines[bad_width])}"
+        )
+    if not horses:
         raise ValueError("No horse tile found in map.")
 
+    # Portal cells are exactly the digit characters, so their ids are the code points minus ord("0"), in scan order.
+    portal_mask = codes == TILE_CODES[Tile.PORTAL]
+    portal_ids: Dict[Coord, int] = dict(zip(mask_coords(portal_mask), (chars[portal_mask] - ord("0")).tolist()))
+    portals: Dict[int, List[Coord]] = {}
+    for coord, portal_id in portal_ids.items():
+        portals.setdefault(portal_id, []).append(coord)
+
     return MapData(
-        grid=grid,
+        grid=codes.astype(np.int8),
         width=width,
-        height=len(grid),
-        horse=horse,
+        height=len(raw_lines),
+        horse=horses[0],
         portals=portals,
         portal_ids=portal_ids,
-        cherries=cherries,
-        golden_apples=golden_apples,
-        bees=bees,
+        cherries=mask_coords(codes == TILE_CODES[Tile.CHERRY]),
+        golden_apples=mask_coords(codes == TILE_CODES[Tile.GOLDEN_APPLE]),
+        bees=mask_coords(codes == TILE_CODES[Tile.BEE]),
     )
@@ -0,0 +1,100 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from .cp_sat_solver import solve_cp_sat
+from .ilp_solver import SolverResult
+from .parser import MapData, parse_map_file
+
+
+@dataclass(frozen=True)
+class TuningCase:
+    map_path: Path
+    max_walls: int
+
+
+@dataclass
+class TuningResult:
+    name: str
+    params: str
+    total_seconds: float
+    solved: int
+
+
+# Wall budgets for the bundled maps (known optima are asserted in tests/test_solver.py).
+DEFAULT_WALL_BUDGETS: Dict[str, int] = {
+    "example_map.txt": 13,
+    "portal_map.txt": 10,
+    "cherry_map.txt": 12,
+    "portal2_map.txt": 12,
+    "2026.01.22_map.txt": 9,
+}
+
+# Candidate SatParameters overrides (protobuf text format) explored by `tune`. Worker count is set separately by
+# _configure_solver; symmetry_level 2 and linearization_level 1 are CP-SAT's defaults, so "default" covers them.
+TUNING_CANDIDATES: Dict[str, str] = {
+    "default": "",
+    "linearization_0": "linearization_level: 0",
+    "linearization_2": "linearization_level: 2",
+    "no_probing": "cp_model_probing_level: 0",
+    "symmetry_3": "symmetry_level: 3",
+    "quick_restart": "search_branching: PORTFOLIO_WITH_QUICK_RESTART_SEARCH",
+    "objective_lb_search": "use_objective_lb_search: true",
+}
+
+
+def default_tuning_cases(maps_dir: Path | str) -> List[TuningCase]:
+    maps_dir = Path(maps_dir)
+    return [
+        TuningCase(maps_dir / name, walls)
+        for name, walls in DEFAULT_WALL_BUDGETS.items()
+        if (maps_dir / name).exists()
+    ]
+
+
+def tune_parameters(
+    cases: Iterable[TuningCase],
+    candidates: Dict[str, str] | None = None,
+    solver_fn: Callable[..., SolverResult] = solve_cp_sat,
+    time_limit: float = 60.0,
+    workers: int | None = None,
+    repeats: int = 1,
+) -> List[TuningResult]:
+    """Time every candidate parameter set over the cases; results are sorted fastest first.
+
+    Each solve is capped at ``time_limit`` seconds; a solve that does not prove optimality is charged the
+    full limit, so candidates that solve more instances always rank ahead. Multi-worker CP-SAT timings are
+    noisy, so use ``repeats`` to sum several runs per case before trusting small differences.
+    """
+    candidates = TUNING_CANDIDATES if candidates is None else candidates
+    maps: List[tuple[MapData, int]] = [(parse_map_file(case.map_path), case.max_walls) for case in cases]
+    if not maps:
+        raise ValueError("No tuning cases provided.")
+
+    results: List[TuningResult] = []
+    for name, params in candidates.items():
+        capped = f"{params}\nmax_time_in_seconds: {time_limit}"
+        total = 0.0
+        solved = 0
+        for map_data, max_walls in maps * repeats:
+            start = time.perf_counter()
+            result = solver_fn(map_data, max_walls=max_walls, workers=workers, params=capped)
+            elapsed = time.perf_counter() - start
+            if result.status == "Optimal":
+                solved += 1
+                total += elapsed
+            else:
+                total += time_limit
+        results.append(TuningResult(name=name, params=params, total_seconds=total, solved=solved))
+    results.sort(key=lambda r: (-r.solved, r.total_seconds))
+    return results
+
+
+def params_file_text(result: TuningResult) -> str:
+    header = (
+        "# CP-SAT SatParameters overrides (protobuf text format), applied before every CP-SAT solve.\n"
+        "# Regenerate with: python -m enclose_horse.cli tune --output src/enclose_horse/data/cp_sat_params.txt\n"
+        f"# Selected candidate: {result.name} ({result.total_seconds:.2f}s, {result.solved} optimal solves)\n"
+    )
+    return header + (f"{result.params}\n" if result.params else "")
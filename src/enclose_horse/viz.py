@@ -5,53 +5,49 @@ import numpy as np
 from matplotlib import colors as mcolors
 
 from .ilp_solver import SolverResult
-from .parser import Coord, MapData, Tile
+from .parser import TILE_CODES, MapData, Tile
 
 
-def _portal_color(portal_id: int) -> str:
-    if portal_id == 0:
-        return "#7e3ff2"  # purple
-    if portal_id == 1:
-        return "#dc143c"  # crimson
-    return "#00bcd4"  # cyan
+# Colors: water=blue, grass=green, pasture=yellow-green, walls=light grey, horse=brown.
+_TILE_COLORS: Dict[Tile, str] = {
+    Tile.WATER: "#4f8dd6",
+    Tile.GRASS: "#7fbf7f",
+    Tile.HORSE: "#8b4513",
+    Tile.CHERRY: "#ff1a1a",
+    Tile.GOLDEN_APPLE: "#f2c94c",
+    Tile.BEE: "#d97706",
+    Tile.PORTAL: "#7fbf7f",  # only used for portals without an id
+}
+_ASSIGNMENT_COLORS: Tuple[str, ...] = ("#d8e85b", "#c0c0c0")  # pasture, wall
+_PORTAL_COLORS: Tuple[str, ...] = ("#7e3ff2", "#dc143c", "#00bcd4")  # purple, crimson, cyan for ids >= 2
 
+# RGBA lookup table indexed by color code: TILE_CODES first, then pasture, wall, and the portal colors.
+_PALETTE = np.array(
+    [mcolors.to_rgba(_TILE_COLORS[tile]) for tile in Tile]
+    + [mcolors.to_rgba(color) for color in _ASSIGNMENT_COLORS + _PORTAL_COLORS],
+    dtype=float,
+)
+_PASTURE_CODE = len(Tile)
+_WALL_CODE = _PASTURE_CODE + 1
+_PORTAL_CODE = _WALL_CODE + 1
+_ASSIGNMENT_CODES: Dict[str, int] = {"pasture": _PASTURE_CODE, "wall": _WALL_CODE}
 
-def _color_for_tile(tile: Tile, assignment: str | None, portal_id: int | None = None) -> str:
-    # Colors: water=blue, grass=green, pasture=yellow-green, walls=light grey, horse=brown.
-    palette: Dict[str, str] = {
-        "water": "#4f8dd6",
-        "grass": "#7fbf7f",
-        "pasture": "#d8e85b",
-        "wall": "#c0c0c0",
-        "horse": "#8b4513",
-        "cherry": "#ff1a1a",
-        "golden_apple": "#f2c94c",
-        "bee": "#d97706",
-    }
-    if tile == Tile.PORTAL and portal_id is not None:
-        return _portal_color(portal_id)
-    if tile == Tile.CHERRY:
-        return palette["cherry"]
-    if tile == Tile.GOLDEN_APPLE:
-        return palette["golden_apple"]
-    if tile == Tile.BEE:
-        return palette["bee"]
-    if tile == Tile.WATER:
-        return palette["water"]
-    if tile == Tile.HORSE:
-        return palette["horse"]
-    if assignment is None:
-        return palette["grass"]
-    return palette[assignment]
+
+def _color_codes(map_data: MapData, result: SolverResult) -> np.ndarray:
+    """Per-cell indices into _PALETTE; items, water, the horse, and numbered portals keep their own color."""
+    codes = map_data.tile_array().astype(np.intp)
+    assignable = (codes == TILE_CODES[Tile.GRASS]) | (codes == TILE_CODES[Tile.PORTAL])
+    for (r, c), state in result.assignments.items():
+        if assignable[r, c] and state != "grass":
+            codes[r, c] = _ASSIGNMENT_CODES[state]
+    for (r, c), portal_id in map_data.portal_ids.items():
+        codes[r, c] = _PORTAL_CODE + (portal_id if portal_id in (0, 1) else 2)
+    return codes
 
 
 def render_solution(map_data: MapData, result: SolverResult) -> Tuple[plt.Figure, plt.Axes]:
     # Build RGBA float grid for imshow (matplotlib rejects object dtype).
-    color_grid = np.zeros((map_data.height, map_data.width, 4), dtype=float)
-    for r, c, tile in map_data.tiles():
-        assignment = result.assignments.get((r, c))
-        portal_id = map_data.portal_ids.get((r, c))
-        color_grid[r, c] = mcolors.to_rgba(_color_for_tile(tile, assignment, portal_id))
+    color_grid = _PALETTE[_color_codes(map_data, result)]
 
     fig, ax = plt.subplots(figsize=(6, 6))
     ax.imshow(color_grid, origin="upper")
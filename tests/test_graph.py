@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import numpy as np
+
+from enclose_horse.graph import (
+    build_adjacency,
+    candidate_tiles,
+    grid_graph,
+    grid_symmetries,
+    no_wall_tiles,
+    prune_tiles,
+    tile_values,
+    undirected_edges,
+)
+from enclose_horse.parser import Tile, parse_map_file
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_undirected_edges_lists_each_edge_once():
+    map_data = parse_map_file(ROOT / "maps" / "portal_map.txt")
+    adjacency = build_adjacency(map_data)
+    edges = undirected_edges(map_data)
+
+    assert len(edges) == len(set(edges))
+    assert {tuple(sorted(edge)) for edge in edges} == {tuple(sorted((u, v))) for u in adjacency for v in adjacency[u]}
+
+
+def test_candidate_tiles_are_non_water_tiles():
+    map_data = parse_map_file(ROOT / "maps" / "cherry_map.txt")
+
+    assert candidate_tiles(map_data) == {(r, c) for r, c, tile in map_data.tiles() if tile != Tile.WATER}
+
+
+def test_grid_graph_matches_adjacency():
+    map_data = parse_map_file(ROOT / "maps" / "portal2_map.txt")
+    graph = grid_graph(map_data)
+    adjacency = build_adjacency(map_data)
+
+    assert graph.coords == sorted(candidate_tiles(map_data))
+    assert graph.indptr.dtype == graph.indices.dtype == np.int32
+    for u, coord in enumerate(graph.coords):
+        assert [graph.coords[v] for v in graph.neighbors(u)] == adjacency[coord]
+    edges = {(graph.coords[u], graph.coords[v]) for u, v in graph.edges}
+    assert edges == set(undirected_edges(map_data))
+    assert all(u < v for u, v in graph.edges)
+
+
+def test_graph_structures_are_cached_per_map():
+    map_data = parse_map_file(ROOT / "maps" / "example_map.txt")
+
+    assert build_adjacency(map_data) is build_adjacency(map_data)
+    assert grid_graph(map_data) is grid_graph(map_data)
+    assert candidate_tiles(map_data) is candidate_tiles(map_data)
+    assert grid_symmetries(map_data) is grid_symmetries(map_data)
+    assert candidate_tiles(map_data) == frozenset(grid_graph(map_data).coords)
+    assert build_adjacency(parse_map_file(ROOT / "maps" / "example_map.txt")) is not build_adjacency(map_data)
+
+
+def test_grid_symmetries_require_fixed_horse(tmp_path):
+    symmetric = tmp_path / "symmetric.txt"
+    symmetric.write_text("~...~\n.....\n..H..\n.....\n~...~\n")
+    shifted = tmp_path / "shifted.txt"
+    shifted.write_text("~...~\n.H...\n.....\n.....\n~...~\n")
+
+    # Both mirrors, the 180 degree turn, both diagonals, and both quarter turns.
+    assert len(grid_symmetries(parse_map_file(symmetric))) == 7
+    # Only the main-diagonal mirror keeps the horse in place.
+    assert grid_symmetries(parse_map_file(shifted)) == [
+        {(r, c): (c, r) for r, c in candidate_tiles(parse_map_file(shifted))}
+    ]
+
+
+def test_prune_tiles_keeps_interior_component_of_horse():
+    map_data = parse_map_file(ROOT / "maps" / "portal_map.txt")
+    enclosable, wallable = prune_tiles(map_data)
+
+    assert map_data.horse in enclosable
+    assert all(0 < r < map_data.height - 1 and 0 < c < map_data.width - 1 for r, c in enclosable)
+    assert wallable.isdisjoint(no_wall_tiles(map_data))
+    adjacency = build_adjacency(map_data)
+    assert all(coord in enclosable or any(n in enclosable for n in adjacency[coord]) for coord in wallable)
+
+
+def test_tile_values_score_bonuses():
+    map_data = parse_map_file(ROOT / "maps" / "cherry_map.txt")
+    values = tile_values(map_data)
+
+    assert set(values) == candidate_tiles(map_data)
+    assert all(values[coord] == 4 for coord in map_data.cherries)
+    assert values[map_data.horse] == 1
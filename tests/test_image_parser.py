@@ -1,9 +1,20 @@
 from pathlib import Path
 
+import json
+
+import numpy as np
 import pytest
 from PIL import Image
 
-from enclose_horse.image_parser import classify_image, load_stats, map_to_string
+from enclose_horse.image_parser import (
+    _cell_features,
+    _load_image,
+    classify_image,
+    detect_grid,
+    load_stats,
+    map_to_string,
+)
+from enclose_horse.parser import Tile
 
 
 @pytest.mark.parametrize("name", ["example", "portal2", "rect", "2026.01.15", "2026.01.22", "2026.01.23"])
@@ -20,8 +31,52 @@ def test_image_parser_tolerates_small_border_offsets(tmp_path, name: str):
         for dy in range(4):
             cropped = img.crop((dx, dy, width, height))
             test_path = tmp_path / f"{name}_{dx}_{dy}.png"
-            cropped.save(test_path)
+            cropped.save(test_path, compress_level=0)  # lossless either way; skipping zlib keeps the sweep fast
 
             parsed, _ = classify_image(test_path, models, scale)
             parsed_text = map_to_string(parsed).strip()
             assert parsed_text == ref_map, f"Mismatch at offset ({dx},{dy})"
+
+
+def test_classify_image_accepts_prototype_mapping():
+    root = Path(__file__).resolve().parents[1]
+    models, scale = load_stats()
+    as_dict = dict(zip(models.labels, models.prototypes.tolist()))
+
+    parsed, _ = classify_image(root / "images" / "portal2.png", as_dict, scale)
+    assert map_to_string(parsed).strip() == (root / "maps" / "portal2_map.txt").read_text().strip()
+
+
+def test_image_pipeline_stays_float32():
+    root = Path(__file__).resolve().parents[1]
+    image = _load_image(root / "images" / "example.png")
+    assert image.dtype == np.float32
+
+    grid = detect_grid(image)
+    assert detect_grid(image.astype(np.float64)) == grid
+    feats, brightness = _cell_features(image, grid, crop_ratio=0.6)
+    assert feats.dtype == np.float32 and brightness.dtype == np.float32
+
+
+def test_scale_only_stats_classify_as_grass(tmp_path):
+    root = Path(__file__).resolve().parents[1]
+    stats_path = tmp_path / "scale_only.json"
+    stats_path.write_text(json.dumps({"_scale": [1.0] * 6}))
+    models, scale = load_stats(stats_path)
+    assert models.labels == ()
+    assert models.prototypes.shape == (0, 6)
+
+    parsed, _ = classify_image(root / "images" / "portal2.png", models, scale)
+    assert set(map_to_string(parsed).replace("\n", "")) == {".", "H"}
+
+
+def test_empty_models_put_the_horse_on_the_brightest_cell():
+    root = Path(__file__).resolve().parents[1]
+    image_path = root / "images" / "example.png"
+    _, scale = load_stats()
+
+    parsed, image = classify_image(image_path, {}, scale)
+    _, brightness = _cell_features(image, detect_grid(image), crop_ratio=0.6)
+    assert parsed.horse == np.unravel_index(np.argmax(brightness), brightness.shape)
+    assert not parsed.portals and not parsed.cherries and not parsed.golden_apples and not parsed.bees
+    assert [(r, c) for r, c, tile in parsed.tiles() if tile != Tile.GRASS] == [parsed.horse]
@@ -1,6 +1,9 @@
 from pathlib import Path
 
-from enclose_horse.parser import Tile, parse_map_file
+import numpy as np
+import pytest
+
+from enclose_horse.parser import TILE_CODES, Tile, mask_coords, parse_map_file
 
 
 def test_parse_example_map():
@@ -56,3 +59,34 @@ def test_parse_bee_map():
 
     assert map_data.bees == [(1, 3)]
     assert map_data.golden_apples == []
+
+
+def test_tile_array_matches_grid():
+    root = Path(__file__).resolve().parents[1]
+    map_data = parse_map_file(root / "maps" / "cherry_map.txt")
+
+    array = map_data.tile_array()
+    assert array.shape == (map_data.height, map_data.width)
+    for r, c, tile in map_data.tiles():
+        assert array[r, c] == TILE_CODES[tile]
+        assert map_data.tile(r, c) is tile
+    assert map_data.tile(*map_data.horse) is Tile.HORSE
+    array[:] = TILE_CODES[Tile.WATER]
+    assert map_data.tile(*map_data.horse) is Tile.HORSE
+
+
+def test_parse_map_file_reports_first_error(tmp_path):
+    map_path = tmp_path / "bad_map.txt"
+    map_path.write_text("H.x\n.H.\n")
+    with pytest.raises(ValueError, match=r"Unexpected tile 'x' at \(0, 2\)"):
+        parse_map_file(map_path)
+
+    map_path.write_text("H.\n.H\n..x\n")
+    with pytest.raises(ValueError, match="Multiple horses"):
+        parse_map_file(map_path)
+
+
+def test_mask_coords_lists_true_cells_in_row_major_order():
+    mask = np.array([[False, True, False], [True, False, True]])
+    assert mask_coords(mask) == [(0, 1), (1, 0), (1, 2)]
+    assert all(isinstance(v, int) for coord in mask_coords(mask) for v in coord)
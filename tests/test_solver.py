@@ -1,6 +1,20 @@
 from pathlib import Path
+from types import SimpleNamespace
 
-from enclose_horse.cp_sat_solver import solve_cp_sat, solve_cp_sat_reachability
+import pytest
+from ortools.sat import sat_parameters_pb2
+from ortools.sat.python import cp_model
+
+from enclose_horse import cp_sat_solver
+from enclose_horse.cp_sat_solver import (
+    _configure_solver,
+    _extract_result,
+    _greedy_enclosure,
+    solve_cp_sat,
+    solve_cp_sat_reachability,
+    solve_portfolio,
+)
+from enclose_horse.graph import build_adjacency
 from enclose_horse.ilp_solver import solve_ilp
 from enclose_horse.parser import parse_map_file
 
@@ -18,6 +32,9 @@ MAP_CASES = [
     ("2026.01.22_map.txt", 9, 79),
 ]
 
+# One water-fenced corridor: the far end is 28 steps from the horse, beyond the reachability depth cap of 22.
+SERPENTINE_MAP = "~~~~~~~~~~~\n~H........~\n~~~~~~~~~.~\n~.........~\n~.~~~~~~~~~\n~.........~\n~~~~~~~~~~~\n"
+
 
 def _assert_solver_hits_optimum(solver_fn):
     for fname, walls, objective in MAP_CASES:
@@ -36,6 +53,124 @@ def test_cp_sat_matches_optima():
     _assert_solver_hits_optimum(solve_cp_sat)
 
 
-# the reachability sat solver is currently not performing -- we disable this test. We might just need to remove this solver. 
-# def test_cp_sat_reachability_matches_optima():
-#     _assert_solver_hits_optimum(solve_cp_sat_reachability)
+# the reachability sat solver is slower than the flow formulation and has a 15 second time limit, so only the
+# quick maps are checked here. Its depth cap binds on the larger maps, so it cannot prove optimality there.
+def test_cp_sat_reachability_matches_small_optima():
+    small_cases = [case for case in MAP_CASES if case[0] not in {"example_map.txt", "portal_map.txt", "cherry_map.txt"}]
+    depth_capped = {"portal2_map.txt", "2026.01.22_map.txt"}
+    for fname, walls, objective in small_cases:
+        map_data = parse_map_file(MAP_ROOT / fname)
+        result = solve_cp_sat_reachability(map_data, max_walls=walls)
+        assert result.status == ("Feasible" if fname in depth_capped else "Optimal")
+        assert round(result.objective) == objective
+        assert result.walls_used() <= walls
+
+
+def test_portfolio_returns_optimum():
+    map_data = parse_map_file(MAP_ROOT / "2026.01.22_map.txt")
+    result = solve_portfolio(map_data, max_walls=9)
+    assert result.status == "Optimal"
+    assert round(result.objective) == 79
+    assert result.walls_used() <= 9
+
+
+# cp-sat-2 cannot reach the corridor's far end, so its answer must never end the race as an optimum.
+def test_portfolio_ignores_depth_capped_optimum(tmp_path, monkeypatch):
+    map_path = tmp_path / "serpentine_map.txt"
+    map_path.write_text(SERPENTINE_MAP)
+    map_data = parse_map_file(map_path)
+    result = solve_portfolio(map_data, max_walls=2)
+    assert result.status == "Optimal"
+    assert round(result.objective) == 29
+
+    # Racing the reachability model alone shows which status it would have won with.
+    monkeypatch.setattr(cp_sat_solver, "PORTFOLIO_SOLVERS", (solve_cp_sat_reachability,))
+    result = solve_portfolio(map_data, max_walls=2)
+    assert result.status == "Feasible"
+    assert round(result.objective) < 29
+
+
+# Symmetry breaking must keep one optimum per orbit; this map has all eight grid symmetries around the horse.
+def test_cp_sat_symmetry_breaking_keeps_optimum(tmp_path):
+    map_path = tmp_path / "symmetric_map.txt"
+    map_path.write_text(".......\n.~...~.\n...C...\n..CHC..\n...C...\n.~...~.\n.......\n")
+    map_data = parse_map_file(map_path)
+    for walls, objective in [(9, 20), (11, 28)]:
+        for solver_fn, status in ((solve_cp_sat, "Optimal"), (solve_cp_sat_reachability, "Feasible")):
+            result = solver_fn(map_data, max_walls=walls)
+            assert result.status == status  # depth cap 14 < 20 steps over 21 enclosable tiles
+            assert round(result.objective) == objective
+
+
+def test_cp_sat_reachability_depth_cap_is_not_reported_optimal(tmp_path):
+    map_path = tmp_path / "serpentine_map.txt"
+    map_path.write_text(SERPENTINE_MAP)
+    map_data = parse_map_file(map_path)
+    assert round(solve_cp_sat(map_data, max_walls=2).objective) == 29
+    result = solve_cp_sat_reachability(map_data, max_walls=2)
+    assert result.status == "Feasible"
+    assert result.objective <= 29
+
+
+def test_greedy_enclosure_fits_wall_budget():
+    map_data = parse_map_file(MAP_ROOT / "example_map.txt")
+    adjacency = build_adjacency(map_data)
+    hint = _greedy_enclosure(map_data, 13, adjacency, {map_data.horse})
+    assert hint is not None
+    assert hint[map_data.horse] == "pasture"
+    assert sum(1 for state in hint.values() if state == "wall") <= 13
+    for coord, state in hint.items():
+        if state == "pasture":
+            assert all(hint[n] != "grass" for n in adjacency[coord])
+
+
+def test_cp_sat_relative_gap_bounds_objective():
+    map_data = parse_map_file(MAP_ROOT / "example_map.txt")
+    result = solve_cp_sat(map_data, max_walls=13, relative_gap=0.05)
+    assert result.status.lower() in {"optimal", "feasible"}
+    assert result.objective >= 0.95 * 103
+    assert result.walls_used() <= 13
+    # Optimal only when the bound was closed, i.e. the known optimum was found.
+    assert result.status == "Feasible" or round(result.objective) == 103
+
+
+# CP-SAT says OPTIMAL when a gap limit stops the search; only a closed gap may be reported as Optimal.
+def test_extract_result_downgrades_open_gap_to_feasible():
+    coord = (0, 0)
+    for bound, status in ((103.0, "Feasible"), (100.0, "Optimal")):
+        solver = SimpleNamespace(objective_value=100.0, best_objective_bound=bound, value=lambda var: 0)
+        result = _extract_result(solver, cp_model.OPTIMAL, {coord}, {coord: None}, {coord: None})
+        assert result.status == status
+        assert result.objective == 100.0
+
+
+# Older OR-Tools releases expose CpSolver.parameters as a plain protobuf message.
+def test_configure_solver_merges_into_protobuf_parameters():
+    solver = SimpleNamespace(parameters=sat_parameters_pb2.SatParameters())
+    _configure_solver(solver, workers=3, params="linearization_level: 2\nmax_time_in_seconds: 5")
+    assert solver.parameters.linearization_level == 2
+    assert solver.parameters.max_time_in_seconds == 5
+    assert solver.parameters.num_workers == 3
+
+
+def test_cp_sat_reachability_params_override_its_defaults(monkeypatch):
+    seen = {}
+    solve = cp_sat_solver._solve
+
+    def recording_solve(solver, model, stop_event=None):
+        seen["time_limit"] = solver.parameters.max_time_in_seconds
+        seen["seed"] = solver.parameters.random_seed
+        return solve(solver, model, stop_event)
+
+    monkeypatch.setattr(cp_sat_solver, "_solve", recording_solve)
+    map_data = parse_map_file(MAP_ROOT / "enclosure_map.txt")
+    solve_cp_sat_reachability(map_data, max_walls=2)
+    assert seen == {"time_limit": 15.0, "seed": 42}
+    solve_cp_sat_reachability(map_data, max_walls=2, params="max_time_in_seconds: 3\nrandom_seed: 7")
+    assert seen == {"time_limit": 3.0, "seed": 7}
+
+
+def test_cp_sat_rejects_invalid_params():
+    map_data = parse_map_file(MAP_ROOT / "enclosure_map.txt")
+    with pytest.raises(ValueError):
+        solve_cp_sat(map_data, max_walls=2, params="not_a_parameter: 1")
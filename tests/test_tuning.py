@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from ortools.sat.python import cp_model
+
+from enclose_horse.cp_sat_solver import _configure_solver, load_solver_params
+from enclose_horse.ilp_solver import SolverResult
+from enclose_horse.tuning import TuningCase, TuningResult, default_tuning_cases, params_file_text, tune_parameters
+
+ROOT = Path(__file__).resolve().parents[1]
+MAP_ROOT = ROOT / "maps"
+
+
+def test_default_tuning_cases_skips_missing_maps(tmp_path):
+    for name in ("cherry_map.txt", "example_map.txt"):
+        (tmp_path / name).write_text((MAP_ROOT / name).read_text())
+
+    cases = default_tuning_cases(tmp_path)
+    assert cases == [TuningCase(tmp_path / "example_map.txt", 13), TuningCase(tmp_path / "cherry_map.txt", 12)]
+
+
+def test_tune_parameters_ranks_by_solved_then_time():
+    cases = [TuningCase(MAP_ROOT / "enclosure_map.txt", 2), TuningCase(MAP_ROOT / "golden_map.txt", 0)]
+    seen_params = []
+
+    # The stub reads its behaviour from the candidate text: "slow" sleeps, "unsolved" never proves optimality on
+    # the wall-free golden map, and "never" never proves it at all.
+    def solver_fn(map_data, max_walls, workers, params):
+        seen_params.append(params)
+        if params.startswith("slow"):
+            time.sleep(0.05)
+        optimal = not params.startswith("never") and not (params.startswith("unsolved") and max_walls == 0)
+        return SolverResult(status="Optimal" if optimal else "Feasible", objective=0.0, assignments={})
+
+    candidates = {"never": "never", "unsolved": "unsolved", "slow": "slow", "fast": "fast"}
+    results = tune_parameters(cases, candidates=candidates, solver_fn=solver_fn, time_limit=7.0, repeats=2)
+
+    assert [r.name for r in results] == ["fast", "slow", "unsolved", "never"]
+    by_name = {r.name: r for r in results}
+    assert [by_name[name].solved for name in ("fast", "slow", "unsolved", "never")] == [4, 4, 2, 0]
+    # Each non-optimal solve is charged the full time limit.
+    assert by_name["never"].total_seconds == 4 * 7.0
+    assert 2 * 7.0 <= by_name["unsolved"].total_seconds < 2 * 7.0 + 1.0
+    assert by_name["slow"].total_seconds >= 4 * 0.05 > by_name["fast"].total_seconds
+    assert all(params.endswith("\nmax_time_in_seconds: 7.0") for params in seen_params)
+
+
+def test_params_file_text_round_trips(tmp_path):
+    for params, level in (("linearization_level: 2", 2), ("", cp_model.CpSolver().parameters.linearization_level)):
+        path = tmp_path / "cp_sat_params.txt"
+        path.write_text(params_file_text(TuningResult(name="candidate", params=params, total_seconds=1.5, solved=3)))
+
+        solver = cp_model.CpSolver()
+        _configure_solver(solver, workers=1, params=load_solver_params(path))
+        assert solver.parameters.linearization_level == level